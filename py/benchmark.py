@@ -0,0 +1,287 @@
+"""记事本便签性能基准
+
+生成 100 ~ 100k 条中文任务的 memo_data.json，在虚拟 X 显示（Xvfb）上逐项计时：
+加载、保存、渲染、增删改、模式切换、打开大文本文件，并记录峰值内存。
+每个规模在独立子进程中运行，结果写成 JSON，可用 --compare 对比两个版本。
+
+    python benchmark.py --out result.json
+    python benchmark.py --sizes 100 10000 --store journal --out journal.json
+    python benchmark.py --compare old.json new.json
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+TEXT_FILE_MB = [1, 64]  # 打开文本文件的测试大小（64MB 会走只读分页视图）
+REPEAT = 20
+
+# 常用汉字 + 少量标点和数字，生成近似真实的待办文本
+_CJK = ("的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面"
+        "而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把"
+        "性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质"
+        "气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活"
+        "设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则"
+        "任取据处队南给色光门即保治北造百规热领七海口东导器压志世金增争济阶油思术极交受联什认六共权收证改清美再"
+        "采转更单风切打白教速花带安场身车例真务具万每目至达走积示议声报斗完类八离华名确才科张信马节话米整空元况"
+        "今集温传土许步群广石记需段研界拉林律叫且究观越织装影算低持音众书布复容儿须际商非验连断深难近矿千周委素")
+_TAIL = "，。、！？0123456789 "
+
+
+def make_text(rng):
+    length = rng.randint(4, 30)
+    text = "".join(rng.choice(_CJK) for _ in range(length))
+    if rng.random() < 0.3:
+        text += rng.choice(_TAIL) + "".join(rng.choice(_CJK) for _ in range(rng.randint(1, 6)))
+    return text
+
+
+def generate_memo(path, count, seed=0):
+    """生成 count 条任务的 memo_data.json（格式与程序保存的一致）"""
+    from memo_model import dump_tasks_json
+    rng = random.Random(seed)
+    tasks = ({"text": make_text(rng), "done": rng.random() < 0.3} for _ in range(count))
+    dump_tasks_json(path, tasks)
+
+
+def generate_text(path, megabytes, seed=0):
+    """生成指定大小的多行中文文本文件"""
+    rng = random.Random(seed)
+    lines = ["".join(rng.choice(_CJK) for _ in range(rng.randint(10, 80))) for _ in range(4096)]
+    block = ("\n".join(lines) + "\n").encode("utf-8")
+    target = megabytes * 1024 * 1024
+    with open(path, "wb") as f:
+        written = 0
+        while written < target:
+            f.write(block)
+            written += len(block)
+
+
+class Runner:
+    """在一个已创建的 TopNotepad 上计时各项操作"""
+
+    def __init__(self, app, repeat):
+        self.app = app
+        self.root = app.root
+        self.repeat = repeat
+        self.results = []
+
+    def settle(self):
+        """处理完所有挂起的事件和重绘，计时包含界面真正更新的耗时"""
+        self.root.update_idletasks()
+        self.root.update()
+
+    def time(self, case, fn, repeat=None, setup=None):
+        samples = []
+        for _ in range(repeat or self.repeat):
+            if setup:
+                setup()
+                self.settle()
+            start = time.perf_counter()
+            fn()
+            self.settle()
+            samples.append((time.perf_counter() - start) * 1000)
+        self.results.append({
+            "case": case,
+            "repeat": len(samples),
+            "median_ms": round(statistics.median(samples), 3),
+            "min_ms": round(min(samples), 3),
+            "max_ms": round(max(samples), 3),
+        })
+        return samples
+
+
+def run_size(size, store, repeat, text_mb, keep):
+    """子进程入口：在临时目录里准备数据并完成一个规模的全部计时"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, here)
+    workdir = tempfile.mkdtemp(prefix=f"memo-bench-{size}-")
+    os.chdir(workdir)
+    generate_memo("memo_data.json", size)
+
+    import tkinter as tk
+    app_module = importlib.import_module("记事本便签")
+    # 删除确认框在基准中直接确认
+    app_module.messagebox.askyesno = lambda *args, **kwargs: True
+    app_module.messagebox.showinfo = lambda *args, **kwargs: None
+
+    root = tk.Tk()
+    start = time.perf_counter()
+    app = app_module.TopNotepad(root, store=store)
+    runner = Runner(app, repeat)
+    runner.settle()
+    app.ensure_memo()  # 备忘录推迟到首次绘制后加载，计入启动时间
+    runner.results.append({"case": "startup", "repeat": 1,
+                           "median_ms": round((time.perf_counter() - start) * 1000, 3)})
+    for phase in app.startup.report()["phases"]:
+        runner.results.append({"case": f"startup_{phase['name']}", "repeat": 1, "median_ms": phase["ms"]})
+
+    if store == "sqlite":
+        # 首次启动只迁移 JSON；后续计时针对数据库本身
+        runner.time("load_memo_data", lambda: (app.memo.close(), app.load_memo_data()), repeat=3)
+    else:
+        runner.time("load_memo_data", app.load_memo_data, repeat=3)
+
+    runner.time("switch_mode_first_memo", lambda: app.switch_mode("memo"), repeat=1)
+    runner.time("render_tasks", app.render_tasks)
+    runner.time("switch_mode_roundtrip", lambda: (app.switch_mode("note"), app.switch_mode("memo")))
+
+    counter = iter(range(10 ** 9))
+
+    def add():
+        app.entry.delete(0, tk.END)
+        app.entry.insert(0, f"基准任务 {next(counter)}")
+        app.add_task()
+    runner.time("add_task", add)
+    runner.time("toggle_task", lambda: app.toggle_task(0, not app.memo.get(0)["done"]))
+    runner.time("scroll_page", lambda: app.task_frame.scroll_by(app.task_frame.viewport.winfo_height()))
+
+    runner.time("save_memo_data", app.save_memo_data)
+    runner.time("flush_memo_data", lambda: (app.flush_memo_data(), app.persist.flush(60)), repeat=3)
+
+    def select_tenth():
+        if not app.select_mode:
+            app.toggle_select_mode()
+        app.task_frame.selected.update(app.memo.key(i) for i in range(0, app.memo.count(), 10))
+    runner.time("delete_selected", app.delete_selected, repeat=3, setup=select_tenth)
+    app.toggle_select_mode()
+
+    app.switch_mode("note")
+    for megabytes in text_mb:
+        path = os.path.join(workdir, f"text_{megabytes}mb.txt")
+        generate_text(path, megabytes)
+        runner.time(f"open_text_file_{megabytes}mb", lambda: app.open_text_file(path), repeat=3,
+                    setup=app.close_large_file)
+        app.close_large_file()
+
+    app.persist.flush(60)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    app.on_close()
+    if not keep:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {"size": size, "peak_rss_kb": peak_kb, "results": runner.results}
+
+
+def start_xvfb():
+    """没有 DISPLAY 时启动一个 Xvfb，返回进程（调用方负责结束）"""
+    if os.environ.get("DISPLAY"):
+        return None
+    if not shutil.which("Xvfb"):
+        raise SystemExit("没有 DISPLAY，也找不到 Xvfb；请安装 xvfb 或设置 DISPLAY")
+    display = ":%d" % (90 + os.getpid() % 100)
+    proc = subprocess.Popen(["Xvfb", display, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = display
+    time.sleep(1)
+    return proc
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_all(args):
+    xvfb = start_xvfb()
+    try:
+        import tkinter
+        report = {
+            "meta": {
+                "revision": git_revision(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "tk": tkinter.TkVersion,
+                "platform": platform.platform(),
+                "store": args.store,
+                "repeat": args.repeat,
+            },
+            "sizes": [],
+        }
+        for size in args.sizes:
+            cmd = [sys.executable, os.path.abspath(__file__), "--worker", str(size),
+                   "--store", args.store, "--repeat", str(args.repeat),
+                   "--text-mb", *map(str, args.text_mb)]
+            if args.keep:
+                cmd.append("--keep")
+            out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            report["sizes"].append(result)
+            print(f"{size:>7} 条: 峰值内存 {result['peak_rss_kb'] / 1024:.1f} MB", file=sys.stderr)
+            for item in result["results"]:
+                print(f"    {item['case']:<28} {item['median_ms']:>10.2f} ms", file=sys.stderr)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+def compare(old_path, new_path, threshold):
+    """按 (规模, 用例) 对比中位数；变慢超过 threshold 倍时返回非零"""
+    def load(path):
+        with open(path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+        cases = {}
+        for entry in report["sizes"]:
+            for item in entry["results"]:
+                cases[(entry["size"], item["case"])] = item["median_ms"]
+            cases[(entry["size"], "peak_rss_kb")] = entry["peak_rss_kb"]
+        return cases
+
+    old, new = load(old_path), load(new_path)
+    regressions = 0
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key], new[key]
+        ratio = after / before if before else 1.0
+        flag = ""
+        if ratio > threshold and after - before > 1:
+            flag = "  ← 变慢"
+            regressions += 1
+        print(f"{key[0]:>7} {key[1]:<28} {before:>10.2f} → {after:>10.2f}  ×{ratio:.2f}{flag}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="记事本便签性能基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="任务数量")
+    parser.add_argument("--store", choices=["json", "journal", "sqlite", "binary"], default="json")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="每项操作的重复次数")
+    parser.add_argument("--text-mb", type=int, nargs="*", default=TEXT_FILE_MB,
+                        help="打开文本文件的测试大小（MB）")
+    parser.add_argument("--out", help="结果 JSON 路径（默认输出到标准输出）")
+    parser.add_argument("--keep", action="store_true", help="保留临时数据目录")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="对比两份结果")
+    parser.add_argument("--threshold", type=float, default=1.2, help="判定变慢的倍数")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(*args.compare, args.threshold))
+    if args.worker is not None:
+        result = run_size(args.worker, args.store, args.repeat, args.text_mb, args.keep)
+        print(json.dumps(result, ensure_ascii=False))
+        return
+    run_all(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import itertools
+import json
+import os
+import queue
+import threading
+import traceback
+import urllib.request
+import zlib
+
+from memo_persist import atomic_write_json
+from perf_trace import TRACER
+from sync_protocol import PROTOCOL, decode_body, encode_body, merge_record
+
+BATCH_SIZE = 500        # 每次请求最多上传/下载的记录数
+SYNC_DELAY = 1.0        # 本地修改后等待多久再上传（合并连续修改）
+SYNC_INTERVAL = 15.0    # 没有本地修改时拉取服务器变更的间隔
+REQUEST_TIMEOUT = 10.0
+MAX_BACKOFF = 120.0
+
+
+class DeltaSync:
+    """与同步服务器交换增量：本地只记录改过的任务，每次请求上传改动并取回其他设备的改动
+
+    pending 按 id 合并同一任务的多次修改，带宽和耗时只与修改数有关，与任务总数无关。
+    cursor 是服务器的版本号：已应用的服务器变更中最大的版本，下次只取比它新的。
+    网络请求在后台线程进行；取回的变更经 results 队列交给界面线程应用，
+    界面线程把它们写盘后调用 ack()，这之后 cursor 才会前进并保存。
+    """
+
+    def __init__(self, url, state_path):
+        self.url = url.rstrip("/") + "/sync"
+        self.state_path = state_path
+        self.known = set()        # 本地现有任务的 id（只在界面线程读写），用于整体替换后找出增删
+        self.results = queue.Queue()  # (新 cursor, 变更列表)
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        state = self._load_state()
+        self.fresh = state is None  # 第一次同步：需要上传全部任务
+        state = state or {}
+        self.client = state.get("client") or os.urandom(8).hex()
+        self.cursor = state.get("cursor", 0)       # 已应用并保存的服务器版本
+        self._request_cursor = self.cursor          # 下一次请求使用的版本（可能还没应用）
+        self._pending = {r["id"]: r for r in state.get("pending", [])}
+        self._rewinds = 0
+        self._dirty = self.fresh
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            return None  # 状态损坏时按首次同步处理：重新上传，合并是幂等的
+
+    def save_state(self):
+        with self._save_lock:
+            with self._lock:
+                state = {"client": self.client, "cursor": self.cursor,
+                         "pending": list(self._pending.values())}
+                self._dirty = False
+            atomic_write_json(self.state_path, state)
+
+    def start(self, keys):
+        """开始同步；keys 为本地现有任务的 id（首次同步时由调用方先 track 全部任务）"""
+        self.known = set(keys)
+        self._thread = threading.Thread(target=self._run, name="memo-delta-sync", daemon=True)
+        self._thread.start()
+        self._wake.set()
+
+    def track(self, records):
+        """记录本地修改（界面线程调用）：完整任务记录，或 {"id", "deleted_ts"} 表示删除"""
+        with self._lock:
+            for record in records:
+                key = record["id"]
+                self._pending[key] = merge_record(self._pending.get(key), record)
+                if record.get("deleted_ts"):
+                    self.known.discard(key)
+                else:
+                    self.known.add(key)
+            self._dirty = True
+        self._wake.set()
+
+    def deleted_locally(self, key):
+        """本地已删除、还没上传的任务，收到服务器的旧版本时不应重新出现"""
+        with self._lock:
+            record = self._pending.get(key)
+            return bool(record and record["deleted_ts"])
+
+    def ack(self, cursor):
+        """取回的变更已应用并写盘（写盘线程调用），此后才保存新的 cursor"""
+        with self._lock:
+            self.cursor = max(self.cursor, cursor)
+        self.save_state()
+
+    def rewind(self):
+        """取回的变更没能应用（界面线程调用）：丢弃还没取出的结果，下一次从已确认的 cursor 重新取回"""
+        with self._lock:
+            while not self.results.empty():
+                self.results.get_nowait()
+            self._request_cursor = self.cursor
+            self._rewinds += 1  # 正在进行的请求回来后不再推进 cursor
+        self._wake.set()
+
+    def close(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.save_state()
+
+    def _run(self):
+        backoff = SYNC_DELAY
+        while not self._stop.is_set():
+            self._wake.wait(SYNC_INTERVAL)
+            if self._stop.is_set():
+                return
+            # 等一小段时间，把连续的修改合并成一个请求
+            self._stop.wait(SYNC_DELAY)
+            self._wake.clear()
+            try:
+                if self._dirty:
+                    self.save_state()  # 先保存待上传的修改，崩溃后不会丢失
+                while self._round() and not self._stop.is_set():
+                    pass
+                if self._dirty:
+                    self.save_state()  # 已上传的修改从 pending 中去掉
+                self.last_error = None
+                backoff = SYNC_DELAY
+                continue
+            except (OSError, ValueError, KeyError, zlib.error) as e:
+                self.last_error = e  # 服务器不可用或回复不完整
+            except Exception as e:
+                # 意外的错误输出到 stderr 便于排查；线程不能退出，否则之后再也不会同步
+                traceback.print_exc()
+                self.last_error = e
+            # 出错后退避重试，本地修改留在 pending 中
+            if self._stop.wait(backoff):
+                return
+            backoff = min(backoff * 2, MAX_BACKOFF)
+            self._wake.set()
+
+    def _round(self):
+        """一次请求：上传至多 BATCH_SIZE 条修改并取回其他设备的修改，返回是否还需要继续"""
+        with self._lock:
+            batch = list(itertools.islice(self._pending.values(), BATCH_SIZE))
+            cursor = self._request_cursor
+            rewinds = self._rewinds
+        body = encode_body({"v": PROTOCOL, "client": self.client, "cursor": cursor,
+                            "changes": batch, "limit": BATCH_SIZE})
+        with TRACER.span("delta_sync") as span:
+            request = urllib.request.Request(self.url, data=body, method="POST", headers={
+                "Content-Type": "application/json", "Content-Encoding": "deflate"})
+            with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+                raw = response.read()
+            reply = decode_body(raw)
+            if span:
+                span.set(sent=len(batch), received=len(reply["changes"]), bytes_out=len(body), bytes_in=len(raw))
+        with self._lock:
+            for record in batch:
+                # 发送后又被修改过的任务留到下一次
+                if self._pending.get(record["id"]) is record:
+                    del self._pending[record["id"]]
+            self._dirty = True
+            more = bool(self._pending)
+            if rewinds != self._rewinds:
+                return True  # 请求期间界面线程要求重新取回，丢弃这次取回的结果
+            self._request_cursor = reply["cursor"]
+            if reply["changes"] or reply["cursor"] != cursor:
+                self.results.put((reply["cursor"], reply["changes"]))
+        return more or reply["more"]
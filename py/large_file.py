@@ -0,0 +1,201 @@
+import mmap
+import os
+import threading
+import tkinter as tk
+import tkinter.font as tkfont
+from array import array
+
+from ui_scheduler import PRIORITY_LAYOUT
+
+LARGE_FILE_BYTES = 8 * 1024 * 1024  # 超过该大小的文件用只读分页方式打开
+CHECKPOINT_LINES = 64              # 每隔多少行记录一次偏移
+MAX_LINE_BYTES = 8192              # 单行最多显示的字节数（超长行截断）
+
+
+class LargeTextFile:
+    """内存映射的大文本文件：后台线程建立稀疏行偏移索引，按需解码任意行区间"""
+
+    def __init__(self, path, encoding="utf-8"):
+        self.path = path
+        self.encoding = encoding
+        self._file = open(path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        self.mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        self.checkpoints = array("q", [0])  # 第 k*CHECKPOINT_LINES 行的起始偏移
+        self.lines = 0  # 已确认的行数（建索引期间逐步增长）
+        self.done = self.mm is None
+        self._closed = False
+        self._thread = None
+        if self.mm is not None:
+            self._thread = threading.Thread(target=self._build, name="large-file-index", daemon=True)
+            self._thread.start()
+
+    def _build(self):
+        mm = self.mm
+        find = mm.find
+        pos = 0
+        line = 0
+        while not self._closed:
+            nl = find(b"\n", pos)
+            if nl == -1:
+                break
+            pos = nl + 1
+            line += 1
+            if line % CHECKPOINT_LINES == 0:
+                self.checkpoints.append(pos)
+                if line % (CHECKPOINT_LINES * 1024) == 0:
+                    self.lines = line
+        self.lines = line + (1 if pos < self.size else 0)
+        self.done = True
+
+    def read_lines(self, start, count):
+        """读取 [start, start+count) 行（只解码这些行）"""
+        end = min(start + count, self.lines)
+        if self.mm is None or start >= end:
+            return []
+        mm = self.mm
+        pos = self.checkpoints[start // CHECKPOINT_LINES]
+        for _ in range(start % CHECKPOINT_LINES):
+            pos = mm.find(b"\n", pos) + 1
+        result = []
+        for _ in range(end - start):
+            nl = mm.find(b"\n", pos)
+            stop = self.size if nl == -1 else nl
+            raw = mm[pos:min(stop, pos + MAX_LINE_BYTES)]
+            text = raw.decode(self.encoding, errors="replace").rstrip("\r")
+            if stop - pos > MAX_LINE_BYTES:
+                text += " …"
+            result.append(text)
+            pos = stop + 1
+        return result
+
+    def close(self):
+        self._closed = True
+        if self._thread is not None:
+            self._thread.join()
+        if self.mm is not None:
+            self.mm.close()
+        self._file.close()
+
+
+class LargeFileView(tk.Frame):
+    """只读大文件视图：Text 控件里只放视口附近的若干行，滚动时按需换入"""
+
+    def __init__(self, parent, doc, font, margin=200, scheduler=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.doc = doc
+        self.scheduler = scheduler  # FrameScheduler：缩放时每帧只重新物化一次
+        self.margin = margin
+        self.top = 0          # 视口第一行（文件行号，从 0 开始）
+        self.win_start = 0    # Text 中已物化的行区间
+        self.win_end = 0
+        self.linespace = tkfont.Font(font=font).metrics("linespace")
+
+        self.status = tk.Label(self, font=("Microsoft YaHei", 9), fg="#757575", anchor="w")
+        self.status.pack(side=tk.BOTTOM, fill=tk.X)
+        self.vbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.vbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.hbar = tk.Scrollbar(self, orient=tk.HORIZONTAL)
+        self.hbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.text = tk.Text(self, wrap=tk.NONE, font=font, bg="#fafcff", relief="flat",
+                            padx=10, pady=10, xscrollcommand=self.hbar.set,
+                            selectbackground="#bbdefb", state=tk.DISABLED)
+        self.text.pack(fill=tk.BOTH, expand=True)
+        self.hbar.config(command=self.text.xview)
+        self.text.tag_configure("goto", background="#fff59d")
+
+        self.text.bind("<MouseWheel>", self._on_wheel)
+        self.text.bind("<Button-4>", lambda e: self._scroll_break(-3))
+        self.text.bind("<Button-5>", lambda e: self._scroll_break(3))
+        self.text.bind("<Button-1>", lambda e: self.text.focus_set())
+        self.text.bind("<Up>", lambda e: self._scroll_break(-1))
+        self.text.bind("<Down>", lambda e: self._scroll_break(1))
+        self.text.bind("<Prior>", lambda e: self._scroll_break(-self.visible_lines()))
+        self.text.bind("<Next>", lambda e: self._scroll_break(self.visible_lines()))
+        self.text.bind("<Control-Home>", lambda e: self._goto_break(0))
+        self.text.bind("<Control-End>", lambda e: self._goto_break(self.doc.lines))
+        self.text.bind("<Configure>", lambda e: self._schedule_materialize())
+
+        self._poll()
+
+    def visible_lines(self):
+        return max(1, self.text.winfo_height() // self.linespace)
+
+    def _on_wheel(self, event):
+        return self._scroll_break(-3 if event.delta > 0 else 3)
+
+    def _scroll_break(self, delta):
+        self.scroll_to(self.top + delta)
+        return "break"
+
+    def _goto_break(self, line):
+        self.scroll_to(line)
+        return "break"
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == tk.MOVETO:
+            self.scroll_to(int(float(value) * self.doc.lines))
+        elif action == tk.SCROLL:
+            step = self.visible_lines() if unit == tk.PAGES else 1
+            self.scroll_to(self.top + int(value) * step)
+
+    def scroll_to(self, line):
+        line = max(0, min(int(line), self.doc.lines - self.visible_lines()))
+        self.top = line
+        if self.win_start <= line and line + self.visible_lines() <= self.win_end:
+            self._show_top()
+        else:
+            self._materialize()
+
+    def goto_line(self, number):
+        """跳转到第 number 行（从 1 开始）并高亮"""
+        line = max(0, min(number - 1, self.doc.lines - 1))
+        self.scroll_to(line - self.visible_lines() // 2)
+        self.text.tag_remove("goto", "1.0", tk.END)
+        if self.win_start <= line < self.win_end:
+            row = line - self.win_start + 1
+            self.text.tag_add("goto", f"{row}.0", f"{row}.end")
+
+    def _schedule_materialize(self):
+        if self.scheduler is None:
+            self._materialize()
+        else:
+            # 视图可能在执行前被关闭
+            self.scheduler.invalidate(("layout", id(self)),
+                                      lambda: self.winfo_exists() and self._materialize(), PRIORITY_LAYOUT)
+
+    def _materialize(self):
+        """把视口前后 margin 行放入 Text，其余行不占内存"""
+        visible = self.visible_lines()
+        start = max(0, self.top - self.margin)
+        lines = self.doc.read_lines(start, visible + 2 * self.margin + (self.top - start))
+        self.win_start = start
+        self.win_end = start + len(lines)
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(lines))
+        self.text.config(state=tk.DISABLED)
+        self._show_top()
+
+    def _show_top(self):
+        count = max(1, self.win_end - self.win_start)
+        self.text.yview_moveto((self.top - self.win_start) / count)
+        total = max(1, self.doc.lines)
+        self.vbar.set(self.top / total, min(1.0, (self.top + self.visible_lines()) / total))
+        self._update_status()
+
+    def _update_status(self):
+        state = "" if self.doc.done else "（正在建立行索引…）"
+        self.status.config(text=f"📄 {os.path.basename(self.doc.path)} | 只读 | "
+                                f"第 {self.top + 1} 行 / 共 {self.doc.lines} 行{state}")
+
+    def _poll(self):
+        # 行索引建立期间定期刷新，让刚索引到的行可以立即浏览
+        if not self.winfo_exists():
+            return
+        if self.win_end < self.top + self.visible_lines() + self.margin:
+            self._materialize()
+        else:
+            self._show_top()
+        if not self.doc.done:
+            self.after(200, self._poll)
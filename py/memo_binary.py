@@ -0,0 +1,184 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+
+from memo_model import Task, dump_tasks_json
+
+MAGIC = b"MEMO"
+VERSION = 1
+# 文件头：魔数, 版本, 标志位(保留), 任务数, 文本区字节数, 正文 crc32
+_HEADER = struct.Struct("<4sHHIQI")
+
+_TEXT_SLOT = Task.__dict__["text"]  # Task 的 text 槽，LazyTask 用它缓存解码结果
+
+
+class SnapshotError(ValueError):
+    """二进制快照损坏或版本不支持"""
+
+
+class LazyTask(Task):
+    """来自二进制快照的任务：文本在第一次显示或搜索时才解码"""
+
+    __slots__ = ("_snapshot", "_index")
+
+    def __init__(self, id, done, text_ts, done_ts, snapshot, index):
+        self.id = id
+        self.done = done
+        self.text_ts = text_ts
+        self.done_ts = done_ts
+        self._snapshot = snapshot
+        self._index = index
+
+    @property
+    def text(self):
+        try:
+            return _TEXT_SLOT.__get__(self)
+        except AttributeError:
+            value = self._snapshot.text(self._index)
+            _TEXT_SLOT.__set__(self, value)
+            return value
+
+    def raw_text(self):
+        try:
+            return _TEXT_SLOT.__get__(self).encode("utf-8")
+        except AttributeError:
+            return self._snapshot.raw_text(self._index)
+
+
+def _read_column(buf, pos, typecode, count):
+    column = array(typecode)
+    end = pos + count * column.itemsize
+    column.frombytes(buf[pos:end])
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column, end
+
+
+class BinarySnapshot:
+    """内存映射读取的二进制快照
+
+    正文依次为：id(int64) | text_ts(float64) | done_ts(float64) | 文本偏移表(uint64, count+1 项)
+    | 完成状态位图 | UTF-8 文本区，均为小端序。加载时只读入定长的列，文本按需解码。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if os.name == "nt":
+                # Windows 下被映射的文件无法被 os.replace 覆盖，直接整体读入
+                buf = f.read()
+            else:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+        self._buf = buf
+        if len(buf) < _HEADER.size:
+            raise SnapshotError("快照文件不完整")
+        magic, version, _, count, text_bytes, crc = _HEADER.unpack_from(buf)
+        if magic != MAGIC:
+            raise SnapshotError("不是备忘录快照文件")
+        if version != VERSION:
+            raise SnapshotError(f"不支持的快照版本: {version}")
+        with memoryview(buf) as view:
+            if zlib.crc32(view[_HEADER.size:]) != crc:
+                raise SnapshotError("快照校验失败")
+
+        self.count = count
+        pos = _HEADER.size
+        self.ids, pos = _read_column(buf, pos, "q", count)
+        self.text_ts, pos = _read_column(buf, pos, "d", count)
+        self.done_ts, pos = _read_column(buf, pos, "d", count)
+        self.offsets, pos = _read_column(buf, pos, "Q", count + 1)
+        self.done_bits = bytes(buf[pos:pos + (count + 7) // 8])
+        self._text_start = pos + (count + 7) // 8
+        if self._text_start + text_bytes != len(buf) or self.offsets[count] != text_bytes:
+            raise SnapshotError("快照长度不一致")
+
+    def done(self, index):
+        return bool(self.done_bits[index >> 3] >> (index & 7) & 1)
+
+    def raw_text(self, index):
+        start = self._text_start
+        return self._buf[start + self.offsets[index]:start + self.offsets[index + 1]]
+
+    def text(self, index):
+        return self.raw_text(index).decode("utf-8")
+
+    def tasks(self):
+        """按显示顺序生成 LazyTask（不解码任何文本）"""
+        bits = self.done_bits
+        return [LazyTask(key, bool(bits[i >> 3] >> (i & 7) & 1), text_ts, done_ts, self, i)
+                for i, (key, text_ts, done_ts) in enumerate(zip(self.ids, self.text_ts, self.done_ts))]
+
+    def iter_dicts(self):
+        for i in range(self.count):
+            yield {"id": self.ids[i], "text": self.text(i), "done": self.done(i),
+                   "text_ts": self.text_ts[i], "done_ts": self.done_ts[i]}
+
+
+def write_snapshot(path, rows):
+    """原子写入快照；rows 为 (id, 文本 str 或已编码的 bytes, done, text_ts, done_ts)"""
+    ids = array("q")
+    text_ts = array("d")
+    done_ts = array("d")
+    offsets = array("Q", [0])
+    bits = bytearray()
+    texts = []
+    size = 0
+    for i, (key, text, done, t_ts, d_ts) in enumerate(rows):
+        raw = text.encode("utf-8") if isinstance(text, str) else text
+        ids.append(key)
+        text_ts.append(t_ts)
+        done_ts.append(d_ts)
+        size += len(raw)
+        offsets.append(size)
+        texts.append(raw)
+        if i & 7 == 0:
+            bits.append(0)
+        if done:
+            bits[-1] |= 1 << (i & 7)
+    if sys.byteorder == "big":
+        for column in (ids, text_ts, done_ts, offsets):
+            column.byteswap()
+
+    parts = [ids.tobytes(), text_ts.tobytes(), done_ts.tobytes(), offsets.tobytes(), bytes(bits)]
+    crc = 0
+    for part in parts:
+        crc = zlib.crc32(part, crc)
+    for raw in texts:
+        crc = zlib.crc32(raw, crc)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".memo-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, 0, len(ids), size, crc))
+            for part in parts:
+                f.write(part)
+            f.writelines(texts)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def json_to_snapshot(json_path, snapshot_path):
+    """把 memo_data.json（或 save_file 导出的 JSON）转换为二进制快照，缺少的 id 自动补上"""
+    from memo_model import new_task_id
+    with open(json_path, "r", encoding="utf-8-sig") as f:
+        data = json.load(f)
+    write_snapshot(snapshot_path, ((t.get("id") or new_task_id(), t["text"], t["done"],
+                                    t.get("text_ts", 0), t.get("done_ts", 0)) for t in data))
+
+
+def snapshot_to_json(snapshot_path, json_path):
+    """导出为 save_file 使用的 JSON 格式，可再由 open_file 导入"""
+    dump_tasks_json(json_path, BinarySnapshot(snapshot_path).iter_dicts())
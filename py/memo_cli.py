@@ -0,0 +1,312 @@
+"""备忘录文件批处理（命令行，不需要图形界面）
+
+支持 save_file 导出的 JSON、JSON Lines、CSV（text,done 两列）和二进制快照，
+条目校验规则与 open_file 导入相同，另外要求 text 是字符串、done 是布尔值。所有格式都逐条流式读写；多个文件时用进程池并行，
+每个工作进程一次只处理一个文件，并定期替换以免内存持续增长。
+
+    python memo_cli.py convert a.json -o a.csv
+    python memo_cli.py convert exports/*.json --to jsonl --out-dir converted
+    python memo_cli.py merge exports/*.json -o all.json --key text
+    python memo_cli.py stats exports/*.json
+"""
+import argparse
+import csv
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+from memo_import import MemoFormatError, is_memo_item, iter_json_array
+from memo_model import dump_tasks_json
+
+FORMATS = ("json", "jsonl", "csv", "bin")
+_EXTENSIONS = {".json": "json", ".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv", ".bin": "bin"}
+TASKS_PER_WORKER = 32  # 每个工作进程处理这么多个文件后换新进程，释放解析大文件时增长的内存
+_TRUE = {"true", "1", "yes", "y", "是", "✓"}
+_FALSE = {"false", "0", "no", "n", "否", ""}
+
+
+def guess_format(path):
+    fmt = _EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise MemoFormatError(f"无法从扩展名判断格式，请用 --from/--to 指定: {path}")
+    return fmt
+
+
+def _parse_done(value, line):
+    value = value.strip().lower()
+    if value in _TRUE:
+        return True
+    if value in _FALSE:
+        return False
+    raise MemoFormatError(f"第 {line} 行 done 列不是布尔值: {value!r}")
+
+
+def _memo_item(item, where):
+    """校验 JSON 条目并只保留 text、done 两个字段"""
+    if not is_memo_item(item):
+        raise MemoFormatError(f"{where}不是备忘录条目（text 须为字符串，done 须为布尔值）")
+    return {"text": item["text"], "done": item["done"]}
+
+
+def iter_memo_file(path, fmt=None):
+    """逐条读取备忘录文件，生成 {"text", "done"}；不合法的条目抛出 MemoFormatError"""
+    fmt = fmt or guess_format(path)
+    if fmt == "bin":
+        from memo_binary import BinarySnapshot
+        for item in BinarySnapshot(path).iter_dicts():
+            yield {"text": item["text"], "done": item["done"]}
+        return
+    if fmt == "csv":
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or "text" not in reader.fieldnames or "done" not in reader.fieldnames:
+                raise MemoFormatError("CSV 缺少 text 或 done 列")
+            for row in reader:
+                yield {"text": row["text"], "done": _parse_done(row["done"] or "", reader.line_num)}
+        return
+    with open(path, "r", encoding="utf-8-sig") as f:
+        if fmt == "jsonl":
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError:
+                    raise MemoFormatError(f"第 {number} 行不是合法的 JSON") from None
+                yield _memo_item(item, f"第 {number} 行")
+            return
+        for number, item in enumerate(iter_json_array(f), 1):
+            yield _memo_item(item, f"第 {number} 项")
+
+
+def write_memo_file(path, tasks, fmt=None):
+    """逐条写出；先写临时文件，全部成功后再替换目标文件。返回写出的条数"""
+    fmt = fmt or guess_format(path)
+    count = 0
+
+    def counted():
+        nonlocal count
+        for task in tasks:
+            count += 1
+            yield task
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".memo-", suffix=".tmp", dir=directory)
+    os.close(fd)
+    try:
+        if fmt == "json":
+            dump_tasks_json(tmp_path, counted())
+        elif fmt == "bin":
+            from memo_binary import write_snapshot
+            from memo_model import new_task_id
+            write_snapshot(tmp_path, ((new_task_id(), t["text"], t["done"], 0, 0) for t in counted()))
+        elif fmt == "csv":
+            # 带 BOM，Excel 直接打开不会把中文显示成乱码
+            with open(tmp_path, "w", encoding="utf-8-sig", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["text", "done"])
+                writer.writerows((t["text"], "true" if t["done"] else "false") for t in counted())
+        else:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for task in counted():
+                    f.write(json.dumps({"text": task["text"], "done": task["done"]}, ensure_ascii=False))
+                    f.write("\n")
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return count
+
+
+def dedupe_key(task, key):
+    """去重键：text 只看文本，task 看文本和完成状态；用 16 字节摘要代替文本本身以节省内存"""
+    data = task["text"] if key == "text" else ("1" if task["done"] else "0") + task["text"]
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).digest()
+
+
+# ---------- 工作进程中执行的任务：参数和返回值都只有路径和计数，便于跨进程传递 ----------
+
+def _stats_job(job):
+    path, fmt = job
+    total = done = 0
+    try:
+        for task in iter_memo_file(path, fmt):
+            total += 1
+            if task["done"]:
+                done += 1
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        return {"path": path, "error": str(e)}
+    return {"path": path, "total": total, "done": done}
+
+
+def _convert_job(job):
+    src, src_fmt, dst, dst_fmt = job
+    try:
+        count = write_memo_file(dst, iter_memo_file(src, src_fmt), dst_fmt)
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        return {"path": src, "error": str(e)}
+    return {"path": src, "output": dst, "total": count}
+
+
+def _shard_job(job):
+    """merge 的第一步：校验一个文件并在文件内去重，写成 “摘要十六进制<TAB>JSON” 的分片"""
+    src, src_fmt, shard, key = job
+    seen = set()
+    total = kept = 0
+    try:
+        with open(shard, "w", encoding="utf-8") as out:
+            for task in iter_memo_file(src, src_fmt):
+                total += 1
+                digest = b"" if key == "none" else dedupe_key(task, key)
+                if digest:
+                    if digest in seen:
+                        continue
+                    seen.add(digest)
+                kept += 1
+                out.write(digest.hex() + "\t" + json.dumps(task, ensure_ascii=False) + "\n")
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        return {"path": src, "error": str(e)}
+    return {"path": src, "shard": shard, "total": total, "kept": kept}
+
+
+def run_jobs(fn, jobs, workers):
+    """按输入顺序逐个产出结果；只有一个文件或 workers=1 时不启动进程池"""
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield fn(job)
+        return
+    with multiprocessing.Pool(min(workers, len(jobs)), maxtasksperchild=TASKS_PER_WORKER) as pool:
+        yield from pool.imap(fn, jobs)
+
+
+# ---------- 子命令 ----------
+
+def _report_errors(results):
+    failed = [r for r in results if "error" in r]
+    for r in failed:
+        print(f"❌ {r['path']}: {r['error']}", file=sys.stderr)
+    return failed
+
+
+def cmd_stats(args):
+    results = list(run_jobs(_stats_job, [(p, args.from_format) for p in args.inputs], args.workers))
+    failed = _report_errors(results)
+    ok = [r for r in results if "error" not in r]
+    total = sum(r["total"] for r in ok)
+    done = sum(r["done"] for r in ok)
+    if args.json:
+        print(json.dumps({"files": results, "total": total, "done": done}, ensure_ascii=False, indent=2))
+    else:
+        for r in ok:
+            print(f"{r['path']}: 📊 总计: {r['total']} 条 | 已完成: {r['done']} 条")
+        if len(ok) > 1:
+            print(f"合计 {len(ok)} 个文件: 📊 总计: {total} 条 | 已完成: {done} 条")
+    return 1 if failed else 0
+
+
+def cmd_convert(args):
+    if args.output and len(args.inputs) > 1:
+        raise SystemExit("多个输入文件请用 --out-dir 指定输出目录")
+    if not args.output and not args.out_dir:
+        raise SystemExit("请用 -o 指定输出文件或用 --out-dir 指定输出目录")
+    if args.out_dir:
+        if not args.to_format:
+            raise SystemExit("使用 --out-dir 时请用 --to 指定输出格式")
+        os.makedirs(args.out_dir, exist_ok=True)
+    jobs = []
+    for src in args.inputs:
+        if args.output:
+            dst = args.output
+        else:
+            name = os.path.splitext(os.path.basename(src))[0] + "." + args.to_format
+            dst = os.path.join(args.out_dir, name)
+        jobs.append((src, args.from_format, dst, args.to_format))
+    failed = []
+    for r in run_jobs(_convert_job, jobs, args.workers):
+        if "error" in r:
+            failed.append(r)
+        else:
+            print(f"{r['path']} → {r['output']}: {r['total']} 条")
+    _report_errors(failed)
+    return 1 if failed else 0
+
+
+def cmd_merge(args):
+    """各进程并行校验并在文件内去重，主进程按输入顺序流式合并分片、做跨文件去重后写出"""
+    shard_dir = tempfile.mkdtemp(prefix="memo-merge-")
+    try:
+        jobs = [(src, args.from_format, os.path.join(shard_dir, f"{i}.tsv"), args.key)
+                for i, src in enumerate(args.inputs)]
+        results = list(run_jobs(_shard_job, jobs, args.workers))
+        failed = _report_errors(results)
+        if failed and not args.skip_invalid:
+            print("有文件无法读取，未写出结果（可加 --skip-invalid 跳过这些文件）", file=sys.stderr)
+            return 1
+
+        seen = set()
+
+        def merged():
+            for r in results:
+                if "error" in r:
+                    continue
+                with open(r["shard"], "r", encoding="utf-8") as f:
+                    for line in f:
+                        digest, _, item = line.partition("\t")
+                        if digest:
+                            digest = bytes.fromhex(digest)
+                            if digest in seen:
+                                continue
+                            seen.add(digest)
+                        yield json.loads(item)
+
+        count = write_memo_file(args.output, merged(), args.to_format)
+        total = sum(r["total"] for r in results if "error" not in r)
+        print(f"读取 {total} 条，去掉重复 {total - count} 条，写出 {count} 条 → {args.output}")
+        return 1 if failed else 0
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="备忘录文件批处理（无需图形界面）")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("inputs", nargs="+", help="输入文件")
+    common.add_argument("--from", dest="from_format", choices=FORMATS, help="输入格式（默认按扩展名判断）")
+    common.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="并行进程数")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("convert", parents=[common], help="格式转换")
+    p.add_argument("-o", "--output", help="输出文件（单个输入时）")
+    p.add_argument("--out-dir", help="输出目录（多个输入时）")
+    p.add_argument("--to", dest="to_format", choices=FORMATS, help="输出格式（默认按扩展名判断）")
+    p.set_defaults(func=cmd_convert)
+
+    p = sub.add_parser("merge", parents=[common], help="合并多个文件并去重")
+    p.add_argument("-o", "--output", required=True, help="输出文件")
+    p.add_argument("--to", dest="to_format", choices=FORMATS, help="输出格式（默认按扩展名判断）")
+    p.add_argument("--key", choices=["text", "task", "none"], default="text",
+                   help="去重方式：text 文本相同即重复 / task 文本和完成状态都相同 / none 不去重；保留最先出现的一条")
+    p.add_argument("--skip-invalid", action="store_true", help="跳过无法读取的文件，而不是整体失败")
+    p.set_defaults(func=cmd_merge)
+
+    p = sub.add_parser("stats", parents=[common], help="统计任务数和完成数")
+    p.add_argument("--json", action="store_true", help="输出 JSON")
+    p.set_defaults(func=cmd_stats)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
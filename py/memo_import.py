@@ -0,0 +1,158 @@
+import codecs
+import json
+import os
+import queue
+import re
+import threading
+
+SNIFF_BYTES = 4096
+CHUNK_BYTES = 64 * 1024
+BATCH_SIZE = 2000
+MAX_ITEM_CHARS = 1024 * 1024  # 单个条目的最大长度，超过即视为格式错误
+
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+
+
+class MemoFormatError(ValueError):
+    """文件不是备忘录格式（或中途出现不合法的条目）"""
+
+
+def is_memo_item(item):
+    """备忘录条目：text 为字符串、done 为布尔值的对象（导入、命令行、多实例同步共用）"""
+    return isinstance(item, dict) and isinstance(item.get("text"), str) and isinstance(item.get("done"), bool)
+
+
+def sniff_format(path):
+    """只读取文件开头判断格式：以 "[" 开头且第一项是对象（或空数组）视为备忘录 JSON"""
+    with open(path, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+    if head.startswith(codecs.BOM_UTF8):
+        head = head[len(codecs.BOM_UTF8):]
+    head = head.lstrip()
+    if not head.startswith(b"["):
+        return "text"
+    rest = head[1:].lstrip()
+    if rest.startswith(b"{") or rest.startswith(b"]") or (not rest and len(head) < SNIFF_BYTES):
+        return "memo"
+    return "text"
+
+
+def iter_json_array(f, chunk_bytes=CHUNK_BYTES):
+    """逐项解析 JSON 数组，内存中只保留一个读缓冲区"""
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_bytes)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_ws():
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos < len(buf) or not fill():
+                return
+
+    def finish():
+        """越过结尾的 "]"：之后只能有空白，与 json.load 一样拒绝多余内容"""
+        nonlocal pos
+        pos += 1
+        skip_ws()
+        if pos < len(buf):
+            raise MemoFormatError("JSON 数组之后还有多余内容")
+
+    skip_ws()
+    if pos >= len(buf) or buf[pos] != "[":
+        raise MemoFormatError("不是 JSON 数组")
+    pos += 1
+    skip_ws()
+    if pos < len(buf) and buf[pos] == "]":
+        finish()
+        return
+    while True:
+        skip_ws()
+        while True:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+                break
+            except json.JSONDecodeError:
+                # 可能只是缓冲区里的条目还不完整，读入更多再试
+                if eof or len(buf) - pos > MAX_ITEM_CHARS or not fill():
+                    raise MemoFormatError("JSON 内容不完整或格式错误")
+        pos = end
+        yield item
+        skip_ws()
+        if pos >= len(buf):
+            raise MemoFormatError("JSON 数组没有结束")
+        if buf[pos] == "]":
+            finish()
+            return
+        if buf[pos] != ",":
+            raise MemoFormatError("JSON 数组格式错误")
+        pos += 1
+
+
+class MemoImporter:
+    """后台线程流式解析备忘录文件，校验后分批交给界面线程合并
+
+    队列有界，解析速度不会超过界面合并速度，内存占用与文件大小无关。
+    """
+
+    def __init__(self, path, batch_size=BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.total_bytes = os.path.getsize(path)
+        self.read_bytes = 0
+        self.count = 0
+        self.batches = queue.Queue(maxsize=4)  # list / None(结束) / Exception
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="memo-import", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _put(self, item):
+        while not self._cancel.is_set():
+            try:
+                self.batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _run(self):
+        try:
+            with open(self.path, "r", encoding="utf-8-sig") as f:
+                batch = []
+                for item in iter_json_array(f):
+                    if self._cancel.is_set():
+                        return
+                    if not is_memo_item(item):
+                        raise MemoFormatError(f"第 {self.count + len(batch) + 1} 项不是备忘录条目")
+                    batch.append({"text": item["text"], "done": item["done"]})
+                    if len(batch) >= self.batch_size:
+                        self.read_bytes = f.buffer.tell()
+                        self.count += len(batch)
+                        if not self._put(batch):
+                            return
+                        batch = []
+                if batch:
+                    self.count += len(batch)
+                    if not self._put(batch):
+                        return
+            self.read_bytes = self.total_bytes
+            self._put(None)
+        except Exception as e:
+            self._put(e)
+
+    def progress(self):
+        return self.read_bytes / self.total_bytes if self.total_bytes else 1.0
@@ -0,0 +1,171 @@
+import itertools
+import json
+import os
+import zlib
+
+from memo_persist import atomic_write_json
+
+
+class _Replay:
+    """按 id 定位的记录批量回放：新增先缓存，删除只记下 id，最后一次插入、一次过滤
+
+    逐条 insert(0) 或逐条重建列表时，回放耗时与 记录数 × 任务数 成正比。
+    """
+
+    def __init__(self, data, by_id=None):
+        self.data = data
+        self.by_id = {t["id"]: t for t in data if "id" in t} if by_id is None else by_id
+        self.added = []       # 按记录顺序新增的任务
+        self.deleted = set()  # 被删除过的 id
+
+    def apply(self, record):
+        op = record["op"]
+        by_id = self.by_id
+        if op == "add":
+            if record["id"] not in by_id:
+                task = {key: record[key] for key in ("id", "text", "done", "text_ts", "done_ts")}
+                self.added.append(task)
+                by_id[task["id"]] = task
+        elif op == "set":
+            task = by_id.get(record["id"])
+            if task is not None and record["ts"] >= task.get("done_ts", 0):
+                task["done"] = record["done"]
+                task["done_ts"] = record["ts"]
+        elif op == "del":
+            removed = set(record["ids"])
+            for key in removed:
+                by_id.pop(key, None)
+            self.deleted |= removed
+        else:
+            raise ValueError(f"未知日志操作: {op}")
+
+    def finish(self):
+        """把缓存的修改应用到列表：后新增的排在最前，删除后又新增的 id 只保留新任务"""
+        if not self.added and not self.deleted:
+            return
+        by_id = self.by_id
+        deleted = self.deleted
+        tasks = itertools.chain(reversed(self.added), self.data)
+        self.data[:] = [t for t in tasks if t.get("id") not in deleted or by_id.get(t["id"]) is t]
+        self.added = []
+        self.deleted = set()
+
+
+class MemoJournal:
+    """追加日志存储：快照 memo_data.json + 日志 memo_data.json.log
+
+    每次增删改只向日志追加一行 "crc32 json"，启动时用快照回放日志。
+    记录按任务 id 定位并带修改时间，重复回放不会改变结果，因此压缩过程中
+    任意时刻崩溃、或多个实例向同一日志追加都是安全的。
+    旧版按下标定位的日志首行记录其所基于快照的校验值，快照被重写后自动失效。
+    """
+
+    def __init__(self, snapshot_path, compact_bytes=256 * 1024):
+        self.snapshot_path = snapshot_path
+        self.log_path = snapshot_path + ".log"
+        self.compact_bytes = compact_bytes
+        self.log_bytes = 0
+
+    @staticmethod
+    def _encode(record):
+        body = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return b"%08x %s\n" % (zlib.crc32(body), body)
+
+    @staticmethod
+    def _decode(line):
+        """解析一行日志，残缺或校验失败返回 None"""
+        if not line.endswith(b"\n") or len(line) < 10 or line[8:9] != b" ":
+            return None
+        body = line[9:-1]
+        try:
+            if int(line[:8], 16) != zlib.crc32(body):
+                return None
+            return json.loads(body.decode("utf-8"))
+        except (ValueError, UnicodeDecodeError):
+            return None
+
+    @staticmethod
+    def apply(data, record, by_id=None):
+        """把一条日志记录应用到任务列表上；by_id 为 id -> 任务的索引（按 id 定位的记录需要）"""
+        op = record["op"]
+        if "i" in record:
+            # 旧版按下标定位的记录
+            if op == "add":
+                data.insert(record["i"], {"text": record["text"], "done": record["done"]})
+            elif op == "set":
+                data[record["i"]]["done"] = record["done"]
+            elif op == "del":
+                removed = set(record["i"])
+                data[:] = [t for i, t in enumerate(data) if i not in removed]
+            else:
+                raise ValueError(f"未知日志操作: {op}")
+            return
+        replay = _Replay(data, by_id)
+        replay.apply(record)
+        replay.finish()
+
+    def load(self):
+        """读取快照（旧版 memo_data.json 即快照）并回放日志"""
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            raw = b""
+        base = zlib.crc32(raw)
+        data = json.loads(raw.decode("utf-8")) if raw.strip() else []
+
+        self.log_bytes = 0
+        try:
+            f = open(self.log_path, "rb+")
+        except FileNotFoundError:
+            return data
+        with f:
+            first = f.readline()
+            header = self._decode(first)
+            if header is not None and "base" in header:
+                if header["base"] != base:
+                    # 旧版日志属于更早的快照，快照已包含全部内容
+                    f.truncate(0)
+                    return data
+                good = f.tell()
+            else:
+                f.seek(0)
+                good = 0
+            replay = _Replay(data)
+            for line in f:
+                record = self._decode(line)
+                if record is None:
+                    break  # 崩溃时写了一半的最后一条记录，丢弃
+                try:
+                    if "i" in record:
+                        replay.finish()
+                        self.apply(data, record)
+                        replay = _Replay(data)
+                    else:
+                        replay.apply(record)
+                except (KeyError, IndexError, TypeError, ValueError):
+                    break
+                good += len(line)
+            replay.finish()
+            f.truncate(good)
+            self.log_bytes = good
+        return data
+
+    def append(self, records):
+        """追加一批记录（在后台线程调用），一次写入一次 fsync，写入量与列表大小无关"""
+        with open(self.log_path, "ab") as f:
+            f.write(b"".join(self._encode(record) for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+            self.log_bytes = f.tell()  # 其他实例也可能在追加，以文件实际大小为准
+
+    def needs_compaction(self):
+        return self.log_bytes > self.compact_bytes
+
+    def compact(self, data):
+        """把完整列表写成新快照并清空日志（在后台线程调用）"""
+        atomic_write_json(self.snapshot_path, data)
+        if self.log_bytes or os.path.exists(self.log_path):
+            with open(self.log_path, "wb") as f:
+                os.fsync(f.fileno())
+        self.log_bytes = 0
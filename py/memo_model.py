@@ -0,0 +1,272 @@
+import json
+import os
+import time
+
+
+def dump_tasks_json(path, tasks):
+    """逐条写出备忘录 JSON（与 save_file/open_file 使用的格式一致），不在内存中拼出整个文件"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        first = True
+        for task in tasks:
+            text, done = task["text"], task["done"]
+            if isinstance(text, str) and isinstance(done, bool):
+                # 常见情况直接拼出与 indent=2 相同的文本，带缩进的 json.dumps 走纯 Python 编码器，慢数倍
+                item = ('{\n    "text": ' + json.dumps(text, ensure_ascii=False)
+                        + (',\n    "done": true\n  }' if done else ',\n    "done": false\n  }'))
+            else:
+                item = json.dumps({"text": text, "done": done},
+                                  ensure_ascii=False, indent=2).replace("\n", "\n  ")
+            f.write("\n  " if first else ",\n  ")
+            f.write(item)
+            first = False
+        f.write("\n]" if not first else "]")
+
+
+def new_task_id():
+    """跨实例唯一的任务 id（63 位随机整数），随任务一起保存"""
+    return int.from_bytes(os.urandom(8), "little") >> 1
+
+
+class Task:
+    """单条任务记录：用 __slots__ 代替 dict，每条任务的内存约为原来的三分之一
+
+    text_ts / done_ts 是对应字段最后修改的时间，多个实例合并时按字段取较新的值。
+    支持 task["text"] 形式的读取，与 SqliteMemoStore 返回的行用法一致。
+    """
+
+    __slots__ = ("id", "text", "done", "text_ts", "done_ts")
+
+    def __init__(self, id, text, done=False, text_ts=0, done_ts=0):
+        self.id = id
+        self.text = text
+        self.done = bool(done)
+        self.text_ts = text_ts
+        self.done_ts = done_ts
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+    def raw_text(self):
+        return self.text.encode("utf-8")
+
+    def to_dict(self):
+        return {"id": self.id, "text": self.text, "done": self.done,
+                "text_ts": self.text_ts, "done_ts": self.done_ts}
+
+    def __repr__(self):
+        return f"Task({self.id!r}, {self.text!r}, {self.done!r})"
+
+
+class ChangeNotifier:
+    """存储层修改通知，界面通过 subscribe 订阅，存储层本身不依赖 tkinter
+
+    回调形式为 callback(kind, **info)：
+      "insert"  index, keys        在 index 处插入了 len(keys) 条任务（keys 按显示顺序）
+      "update"  indices, keys, done 完成状态改变；批量修改时 indices 为 None，订阅方按 keys 更新
+      "remove"  indices, keys      indices 为删除前的下标，存储层无法给出时为 None
+      "reset"                      数据被整体替换或导入结束
+    """
+
+    def __init__(self):
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def _notify(self, kind, **info):
+        for callback in list(self._subscribers):
+            callback(kind, **info)
+
+
+class MemoStore(ChangeNotifier):
+    """内存任务存储（json / journal 存储方式使用），接口与 SqliteMemoStore 一致
+
+    每条任务有一个稳定的整数 id（随任务保存，跨实例不变），增删不会改变其他任务的 id。
+    """
+
+    def __init__(self, tasks=None):
+        super().__init__()
+        self.tasks = []
+        self._by_id = {}
+        self._done = 0
+        self._import_pos = None
+        if tasks:
+            self._insert(0, tasks)
+
+    @classmethod
+    def from_records(cls, records):
+        """直接使用已构造好的任务记录（如二进制快照的 LazyTask），不读取文本"""
+        store = cls()
+        store.tasks = list(records)
+        store._by_id = {t.id: t for t in store.tasks}
+        store._done = sum(1 for t in store.tasks if t.done)
+        return store
+
+    def _insert(self, pos, tasks):
+        """在 pos 处插入任务（dict，可带 id 和字段时间），返回新任务的 id"""
+        by_id = self._by_id
+        records = []
+        for t in tasks:
+            key = t.get("id")
+            if key is None or key in by_id:
+                key = new_task_id()
+            records.append(Task(key, t["text"], t["done"], t.get("text_ts", 0), t.get("done_ts", 0)))
+        self.tasks[pos:pos] = records
+        self._by_id.update((r.id, r) for r in records)
+        self._done += sum(1 for r in records if r.done)
+        return [r.id for r in records]
+
+    @property
+    def importing(self):
+        return self._import_pos is not None
+
+    def count(self):
+        return len(self.tasks)
+
+    def done_count(self):
+        return self._done
+
+    def get(self, index):
+        return self.tasks[index]
+
+    def key(self, index):
+        return self.tasks[index].id
+
+    def get_by_key(self, key):
+        return self._by_id[key]
+
+    def has(self, key):
+        return key in self._by_id
+
+    def index_of(self, key):
+        return self.tasks.index(self._by_id[key])
+
+    def add(self, text):
+        """在最前面插入一条新任务，返回其 id"""
+        return self.add_many([text])[0]
+
+    def add_many(self, texts):
+        """把多条新任务插到最前面（texts[0] 排第一），返回新任务的 id"""
+        now = time.time()
+        keys = self._insert(0, ({"text": text, "done": False, "text_ts": now, "done_ts": now}
+                                for text in texts))
+        if keys:
+            self._notify("insert", index=0, keys=keys)
+        return keys
+
+    def set_done(self, index, done):
+        task = self.tasks[index]
+        if task.done == done:
+            return False
+        task.done = done
+        task.done_ts = time.time()
+        self._done += 1 if done else -1
+        self._notify("update", indices=[index], keys=[task.id], done=done)
+        return True
+
+    def toggle_many(self, keys, done, stamps=None):
+        """按 id 设置多条任务的完成状态，返回状态确实改变的 id；耗时只与 keys 的数量有关
+
+        stamps 为 {id: 修改时间}，合并其他实例的修改时保留对方的时间。
+        """
+        now = time.time()
+        changed = []
+        for key in keys:
+            task = self._by_id.get(key)
+            if task is not None and task.done != done:
+                task.done = done
+                task.done_ts = stamps[key] if stamps else now
+                changed.append(key)
+        if changed:
+            self._done += len(changed) if done else -len(changed)
+            # 求下标要遍历全部任务，订阅方只按 keys 更新，不提供下标
+            self._notify("update", indices=None, keys=changed, done=done)
+        return changed
+
+    def delete_many(self, keys):
+        """一次遍历删除多条任务，返回被删除的下标"""
+        keys = set(keys)
+        removed = []
+        removed_keys = []
+        kept = []
+        for i, task in enumerate(self.tasks):
+            if task.id in keys:
+                removed.append(i)
+                removed_keys.append(task.id)
+                del self._by_id[task.id]
+                if task.done:
+                    self._done -= 1
+            else:
+                kept.append(task)
+        if removed:
+            self.tasks[:] = kept
+            self._notify("remove", indices=removed, keys=removed_keys)
+        return removed
+
+    def prepend(self, tasks):
+        """把一批任务插到最前面，tasks[0] 成为新的第一条"""
+        keys = self._insert(0, tasks)
+        if keys:
+            self._notify("insert", index=0, keys=keys)
+
+    def replace(self, tasks):
+        self.tasks = []
+        self._by_id = {}
+        self._done = 0
+        self._insert(0, tasks)
+        self._notify("reset")
+
+    def begin_import(self):
+        """开始分批导入：导入的任务依次排在原有任务之前"""
+        self._import_pos = 0
+
+    def import_batch(self, tasks):
+        """就地插入一批导入的任务，返回这批任务的起始下标"""
+        pos = self._import_pos
+        keys = self._insert(pos, tasks)
+        self._import_pos += len(keys)
+        self._notify("insert", index=pos, keys=keys)
+        return pos
+
+    def end_import(self, replace=False):
+        """导入完成；replace 时删除原有任务"""
+        if replace:
+            self._drop(self._import_pos, len(self.tasks))
+        self._import_pos = None
+        self._notify("reset")
+
+    def abort_import(self):
+        """撤销已导入的部分"""
+        self._drop(0, self._import_pos)
+        self._import_pos = None
+        self._notify("reset")
+
+    def _drop(self, start, stop):
+        for task in self.tasks[start:stop]:
+            del self._by_id[task.id]
+            if task.done:
+                self._done -= 1
+        del self.tasks[start:stop]
+
+    def iter_tasks(self):
+        return iter(self.tasks)
+
+    def iter_entries(self):
+        """按显示顺序遍历 (key, text, done)，用于建立搜索索引"""
+        for task in self.tasks:
+            yield task.id, task.text, task.done
+
+    def snapshot_rows(self):
+        """二进制快照用的行快照（界面线程调用）；文本不可变，由后台线程再取原始字节"""
+        return [(t.id, t, t.done, t.text_ts, t.done_ts) for t in self.tasks]
+
+    def export(self):
+        """完整记录（含 id 和字段时间），用于保存和合并"""
+        return [t.to_dict() for t in self.tasks]
+
+    def close(self):
+        pass
@@ -0,0 +1,109 @@
+import json
+import os
+import queue
+import threading
+from collections import deque
+
+
+def atomic_write_json(path, data):
+    """先写临时文件并 fsync，再原子替换目标文件，写到一半崩溃也不会截断原文件"""
+    import tempfile  # 只在后台写盘时用到，不拖慢启动
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".memo-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class PersistWorker:
+    """后台写盘线程：任务按提交顺序执行，同一 key 的待执行任务只保留最新一个
+
+    合并时新任务排到队尾，所以依赖某次写入的任务（如同步确认）用 submit_after 挂在它后面，
+    不能只靠提交顺序。
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._jobs = deque()  # (key, fn, 跟随任务列表)
+        self._running = False
+        self._closed = False
+        self.errors = queue.Queue()  # 写盘异常，由界面线程轮询取出
+        self._thread = threading.Thread(target=self._run, name="memo-persist", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, key=None):
+        """提交写盘任务；key 相同的旧任务若尚未执行则被丢弃（合并写入）"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("PersistWorker 已关闭")
+            followers = []
+            if key is not None:
+                old = self._pending(key)
+                if old is not None:
+                    self._jobs.remove(old)
+                    followers = old[2]  # 挂在旧任务后面的任务改为跟随新任务
+            self._jobs.append((key, fn, followers))
+            self._cond.notify_all()
+
+    def submit_after(self, key, fn):
+        """提交在 key 的待执行任务成功之后才执行的任务；该任务被合并时跟随新任务，失败时不执行
+
+        没有待执行的 key 任务时按普通任务排队（正在执行的任务一定在它之前完成）。
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("PersistWorker 已关闭")
+            job = self._pending(key)
+            if job is not None:
+                job[2].append(fn)
+            else:
+                self._jobs.append((None, fn, []))
+                self._cond.notify_all()
+
+    def _pending(self, key):
+        for job in self._jobs:
+            if job[0] == key:
+                return job
+        return None
+
+    def flush(self, timeout=None):
+        """等待所有已提交任务写完，返回是否在超时前完成"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._jobs and not self._running, timeout)
+
+    def close(self, timeout=None):
+        """写完剩余任务后停止线程"""
+        done = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        return done
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._jobs or self._closed)
+                if not self._jobs:
+                    return
+                _, fn, followers = self._jobs.popleft()
+                self._running = True
+            try:
+                fn()
+                for follower in followers:
+                    follower()
+            except Exception as e:
+                self.errors.put(e)
+            finally:
+                with self._cond:
+                    self._running = False
+                    self._cond.notify_all()
@@ -0,0 +1,158 @@
+import threading
+
+
+def _grams(text):
+    """单字 + 相邻二字组合，适用于不分词的中文文本"""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+class NgramIndex:
+    """任务文本的内存倒排索引（字符 n-gram），支持增量更新
+
+    键值与存储层的 key() 一致；order 越大越靠前（与列表显示顺序相同）。
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.postings = {}   # gram -> set(key)
+        self.docs = {}       # key -> 小写文本
+        self.order = {}      # key -> 排序值
+        self.done_keys = set()
+        self._top = 0
+
+    def build(self, entries):
+        """entries: 按显示顺序的 (key, text, done)"""
+        self.clear()
+        for position, (key, text, done) in enumerate(entries):
+            self._insert(key, text, done, -position)
+
+    def _insert(self, key, text, done, order):
+        text = text.lower()
+        self.docs[key] = text
+        self.order[key] = order
+        if done:
+            self.done_keys.add(key)
+        for gram in _grams(text):
+            self.postings.setdefault(gram, set()).add(key)
+
+    def add(self, key, text, done=False):
+        """新任务插到最前面"""
+        self._top += 1
+        self._insert(key, text, done, self._top)
+
+    def remove(self, key):
+        text = self.docs.pop(key, None)
+        if text is None:
+            return
+        del self.order[key]
+        self.done_keys.discard(key)
+        for gram in _grams(text):
+            keys = self.postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.postings[gram]
+
+    def set_done(self, key, done):
+        if key not in self.docs:
+            return
+        if done:
+            self.done_keys.add(key)
+        else:
+            self.done_keys.discard(key)
+
+    def search(self, query, status=None):
+        """返回匹配的键值（按显示顺序）；status 为 "done"/"todo" 时按完成状态过滤"""
+        query = query.strip().lower()
+        if query:
+            if len(query) == 1:
+                candidates = set(self.postings.get(query, ()))
+            else:
+                grams = sorted({query[i:i + 2] for i in range(len(query) - 1)},
+                               key=lambda g: len(self.postings.get(g, ())))
+                candidates = set(self.postings.get(grams[0], ()))
+                for gram in grams[1:]:
+                    if not candidates:
+                        break
+                    candidates &= self.postings.get(gram, set())
+                # 二字组合都命中不代表连续出现，最后核对一次子串
+                if len(query) > 2:
+                    candidates = {k for k in candidates if query in self.docs[k]}
+        else:
+            candidates = None
+
+        if status == "done":
+            candidates = self.done_keys if candidates is None else candidates & self.done_keys
+        elif status == "todo":
+            candidates = (self.docs.keys() - self.done_keys if candidates is None
+                          else candidates - self.done_keys)
+        elif candidates is None:
+            candidates = self.docs.keys()
+
+        order = self.order
+        return sorted(candidates, key=order.__getitem__, reverse=True)
+
+
+class SearchIndexer:
+    """在后台线程建立 NgramIndex，建立期间的增删改先记下，完成后按顺序补上"""
+
+    def __init__(self):
+        self.index = None
+        self._thread = None
+        self._pending = []
+
+    @property
+    def ready(self):
+        return self.index is not None and self._thread is None
+
+    @property
+    def building(self):
+        return self._thread is not None
+
+    def start(self, entries):
+        """entries 需是按显示顺序的 (key, text, done) 列表快照"""
+        self.index = None
+        self._pending = []
+        built = NgramIndex()
+        self._thread = threading.Thread(target=built.build, args=(entries,),
+                                        name="memo-search-index", daemon=True)
+        self._thread.built = built
+        self._thread.start()
+
+    def poll(self):
+        """由界面线程定期调用；索引建好后返回 True"""
+        if self._thread is not None and not self._thread.is_alive():
+            self.index = self._thread.built
+            self._thread = None
+            for method, args in self._pending:
+                getattr(self.index, method)(*args)
+            self._pending = []
+        return self.ready
+
+    def invalidate(self):
+        """数据被整体替换，下次搜索时重建"""
+        self.index = None
+        self._thread = None
+        self._pending = []
+
+    def _apply(self, method, *args):
+        if self.ready:
+            getattr(self.index, method)(*args)
+        elif self.building:
+            self._pending.append((method, args))
+
+    def add(self, key, text, done=False):
+        self._apply("add", key, text, done)
+
+    def remove(self, key):
+        self._apply("remove", key)
+
+    def set_done(self, key, done):
+        self._apply("set_done", key, done)
+
+    def search(self, query, status=None):
+        return self.index.search(query, status)
@@ -0,0 +1,241 @@
+import json
+import sqlite3
+from collections import OrderedDict
+
+from memo_model import ChangeNotifier
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id   INTEGER PRIMARY KEY AUTOINCREMENT,
+    seq  INTEGER NOT NULL,
+    text TEXT    NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_seq ON tasks (seq);
+CREATE INDEX IF NOT EXISTS idx_tasks_done_seq ON tasks (done, seq);
+"""
+
+IMPORT_SEQ_SPAN = 1 << 40  # 分批导入时预留的 seq 区间，导入的任务都排在原有任务之前
+
+
+class SqliteMemoStore(ChangeNotifier):
+    """SQLite 任务存储：按 seq 倒序分页读取，内存里只缓存少量页
+
+    下标 0 是最新添加的任务（seq 最大），与 MemoStore 的顺序一致。
+    """
+
+    def __init__(self, path, page_size=128, cache_pages=8):
+        super().__init__()
+        self._import_pos = None
+        self.path = path
+        self.page_size = page_size
+        self.cache_pages = cache_pages
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._pages = OrderedDict()  # 页号 -> [{"id", "seq", "text", "done"}]
+        self._recount()
+
+    def _recount(self):
+        self._count = self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+        self._done = self.conn.execute("SELECT COUNT(*) FROM tasks WHERE done = 1").fetchone()[0]
+
+    def _insert(self, top, tasks):
+        """按 seq 从 top 递减插入，返回新任务的 id（AUTOINCREMENT 在同一事务内连续分配）"""
+        with self.conn:
+            cursor = self.conn.executemany(
+                "INSERT INTO tasks (seq, text, done) VALUES (?, ?, ?)",
+                ((top - i, t["text"], int(bool(t["done"]))) for i, t in enumerate(tasks)))
+            count = cursor.rowcount
+            last = self.conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        return list(range(last - count + 1, last + 1))
+
+    @property
+    def importing(self):
+        return self._import_pos is not None
+
+    def _max_seq(self):
+        return self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM tasks").fetchone()[0]
+
+    def _page(self, number):
+        page = self._pages.get(number)
+        if page is not None:
+            self._pages.move_to_end(number)
+            return page
+        prev = self._pages.get(number - 1)
+        if prev and len(prev) == self.page_size:
+            # 上一页已缓存时按 seq 续读，避免 OFFSET 逐行跳过
+            cursor = self.conn.execute(
+                "SELECT id, seq, text, done FROM tasks WHERE seq < ? ORDER BY seq DESC LIMIT ?",
+                (prev[-1]["seq"], self.page_size))
+        else:
+            cursor = self.conn.execute(
+                "SELECT id, seq, text, done FROM tasks ORDER BY seq DESC LIMIT ? OFFSET ?",
+                (self.page_size, number * self.page_size))
+        page = [{"id": i, "seq": s, "text": t, "done": bool(d)} for i, s, t, d in cursor]
+        self._pages[number] = page
+        if len(self._pages) > self.cache_pages:
+            self._pages.popitem(last=False)
+        return page
+
+    def count(self):
+        return self._count
+
+    def done_count(self):
+        return self._done
+
+    def get(self, index):
+        number, offset = divmod(index, self.page_size)
+        return self._page(number)[offset]
+
+    def key(self, index):
+        return self.get(index)["id"]
+
+    def get_by_key(self, key):
+        row = self.conn.execute("SELECT id, seq, text, done FROM tasks WHERE id = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return {"id": row[0], "seq": row[1], "text": row[2], "done": bool(row[3])}
+
+    def has(self, key):
+        return self.conn.execute("SELECT 1 FROM tasks WHERE id = ?", (key,)).fetchone() is not None
+
+    def index_of(self, key):
+        """按 seq 索引统计排在前面的任务数"""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE seq > (SELECT seq FROM tasks WHERE id = ?)",
+            (key,)).fetchone()[0]
+
+    def iter_entries(self):
+        """按显示顺序遍历 (key, text, done)，用于建立搜索索引"""
+        cursor = self.conn.execute("SELECT id, text, done FROM tasks ORDER BY seq DESC")
+        for key, text, done in cursor:
+            yield key, text, bool(done)
+
+    def add(self, text):
+        """在最前面插入一条新任务，返回其 id"""
+        return self.add_many([text])[0]
+
+    def add_many(self, texts):
+        """把多条新任务插到最前面（texts[0] 排第一），返回新任务的 id"""
+        texts = list(texts)
+        keys = self._insert(self._max_seq() + len(texts), ({"text": t, "done": False} for t in texts))
+        self._count += len(keys)
+        self._pages.clear()
+        if keys:
+            self._notify("insert", index=0, keys=keys)
+        return keys
+
+    def set_done(self, index, done):
+        task = self.get(index)
+        if task["done"] == done:
+            return False
+        with self.conn:
+            self.conn.execute("UPDATE tasks SET done = ? WHERE id = ?", (int(done), task["id"]))
+        task["done"] = done
+        self._done += 1 if done else -1
+        self._notify("update", indices=[index], keys=[task["id"]], done=done)
+        return True
+
+    def toggle_many(self, keys, done, stamps=None):
+        """按 id 批量设置完成状态（单条语句），返回状态确实改变的 id
+
+        表中不保存字段修改时间，stamps 只为与 MemoStore 接口一致而接受，不使用。
+        """
+        ids = json.dumps(list(keys))
+        with self.conn:
+            changed = [row[0] for row in self.conn.execute(
+                "SELECT id FROM tasks WHERE done != ? AND id IN (SELECT value FROM json_each(?))",
+                (int(done), ids))]
+            self.conn.execute("UPDATE tasks SET done = ? WHERE id IN (SELECT value FROM json_each(?))",
+                              (int(done), ids))
+        if changed:
+            self._done += len(changed) if done else -len(changed)
+            self._pages.clear()
+            self._notify("update", indices=None, keys=changed, done=done)
+        return changed
+
+    def delete_many(self, keys):
+        """按 id 批量删除（单条语句），下标变化由订阅方整体刷新"""
+        keys = list(keys)
+        ids = json.dumps(keys)
+        with self.conn:
+            # 只统计被删除的行，计数随之增减，不必对整表重新 COUNT
+            removed, removed_done = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(done), 0) FROM tasks WHERE id IN (SELECT value FROM json_each(?))",
+                (ids,)).fetchone()
+            self.conn.execute("DELETE FROM tasks WHERE id IN (SELECT value FROM json_each(?))", (ids,))
+        self._count -= removed
+        self._done -= removed_done
+        self._pages.clear()
+        self._notify("remove", indices=None, keys=keys)
+        return None
+
+    def prepend(self, tasks):
+        """把一批任务插到最前面，tasks[0] 成为新的第一条"""
+        tasks = list(tasks)
+        keys = self._insert(self._max_seq() + len(tasks), tasks)
+        self._count += len(keys)
+        self._done += sum(1 for t in tasks if t["done"])
+        self._pages.clear()
+        if keys:
+            self._notify("insert", index=0, keys=keys)
+
+    def begin_import(self):
+        """开始分批导入：导入的任务依次排在原有任务之前"""
+        self._import_floor = self._max_seq()  # 原有任务的 seq 都不超过它
+        self._import_next = self._import_floor + IMPORT_SEQ_SPAN
+        self._import_pos = 0
+
+    def import_batch(self, tasks):
+        """插入一批导入的任务，返回这批任务的起始下标"""
+        keys = self._insert(self._import_next, tasks)
+        pos = self._import_pos
+        self._import_next -= len(tasks)
+        self._import_pos += len(tasks)
+        self._count += len(tasks)
+        self._done += sum(1 for t in tasks if t["done"])
+        self._pages.clear()
+        self._notify("insert", index=pos, keys=keys)
+        return pos
+
+    def end_import(self, replace=False):
+        """导入完成；replace 时删除原有任务"""
+        if replace:
+            with self.conn:
+                self.conn.execute("DELETE FROM tasks WHERE seq <= ?", (self._import_floor,))
+            self._recount()
+            self._pages.clear()
+        self._import_pos = None
+        self._notify("reset")
+
+    def abort_import(self):
+        """撤销已导入的部分"""
+        with self.conn:
+            self.conn.execute("DELETE FROM tasks WHERE seq > ?", (self._import_floor,))
+        self._recount()
+        self._pages.clear()
+        self._import_pos = None
+        self._notify("reset")
+
+    def replace(self, tasks):
+        tasks = list(tasks)
+        with self.conn:
+            self.conn.execute("DELETE FROM tasks")
+        self._insert(len(tasks), tasks)
+        self._recount()
+        self._pages.clear()
+        self._notify("reset")
+
+    def iter_tasks(self):
+        """按显示顺序流式遍历全部任务"""
+        cursor = self.conn.execute("SELECT text, done FROM tasks ORDER BY seq DESC")
+        for text, done in cursor:
+            yield {"text": text, "done": bool(done)}
+
+    def export(self):
+        return list(self.iter_tasks())
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,195 @@
+import os
+import queue
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from memo_import import is_memo_item
+from memo_model import new_task_id
+
+
+class FileLock:
+    """跨进程互斥锁（锁文件 + flock / msvcrt.locking），同一进程内的线程也互斥"""
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            self._file = open(self.path, "a+b")
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            else:
+                self._file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        pass  # LK_LOCK 重试约 10 秒后仍拿不到会抛错，继续等
+        except BaseException:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+            self._thread_lock.release()
+        return False
+
+
+def _newer(a, b, field):
+    """按字段时间取较新的值；时间相同时取较大的值，保证各实例合并结果一致"""
+    ts = field + "_ts"
+    return max((a.get(ts, 0), a[field]), (b.get(ts, 0), b[field]))
+
+
+def merge_tasks(local, disk, base):
+    """三方合并：local 本实例的任务，disk 文件中的任务，base 上次同步时双方共有的 id
+
+    只在一方出现的任务：不在 base 中是新增，保留；在 base 中说明另一方已删除，丢弃。
+    两方都有的任务逐字段取较新的修改。顺序以文件为准，本实例新增的任务排在最前，
+    各实例各自新增任务后只需各写一次文件，之后的合并结果与文件相同。
+    """
+    local_by_id = {t["id"]: t for t in local}
+    disk_ids = set()
+    kept = []
+    for task in disk:
+        key = task["id"]
+        disk_ids.add(key)
+        mine = local_by_id.get(key)
+        if mine is None:
+            if key not in base:
+                kept.append(task)
+            continue
+        if mine == task:
+            kept.append(task)
+            continue
+        text_ts, text = _newer(mine, task, "text")
+        done_ts, done = _newer(mine, task, "done")
+        kept.append({"id": key, "text": text, "done": done, "text_ts": text_ts, "done_ts": done_ts})
+    added = [t for t in local if t["id"] not in disk_ids and t["id"] not in base]
+    return added + kept
+
+
+def _fields(tasks):
+    """id -> 各字段，判断两份任务是否有实际差异（与顺序无关）"""
+    return {t["id"]: (t["text"], t["done"], t.get("text_ts", 0), t.get("done_ts", 0)) for t in tasks}
+
+
+class MemoSync:
+    """多个实例共享 memo_data.json（及其日志）
+
+    读改写都在文件锁内完成；每次同步先读入文件，与本实例的数据三方合并后再写回，
+    其他实例的修改不会被覆盖。通过比较文件的修改时间和大小廉价地发现外部修改。
+    """
+
+    def __init__(self, journal):
+        self.journal = journal
+        self.lock = FileLock(journal.snapshot_path + ".lock")
+        self.base = set()         # 上次同步后文件中的任务 id（只在持锁时读写）
+        self.results = queue.Queue()  # (发送的快照, 合并结果)，由界面线程取出并应用
+        self._known = None        # 本实例最后一次读写后文件的状态
+        self._external = False    # 追加日志前发现文件已被其他实例修改
+        self.corrupt = queue.Queue()  # 读不出的文件被移到的备份路径，由界面线程提示用户
+
+    def _stat(self):
+        state = []
+        for path in (self.journal.snapshot_path, self.journal.log_path):
+            try:
+                st = os.stat(path)
+                state.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                state.append(None)
+        return tuple(state)
+
+    def changed(self):
+        """文件是否被其他实例修改过（界面线程定期调用，只做两次 stat）"""
+        return self._external or self._stat() != self._known
+
+    def _read(self):
+        """持锁时读取文件，返回 (任务列表, 是否损坏)
+
+        内容无法解析时把快照和日志移到 .corrupt 备份，按空文件继续；
+        否则之后每次同步都会读取失败，文件状态也一直显示为被外部修改。
+        """
+        try:
+            data = self.journal.load()
+            if isinstance(data, list) and all(is_memo_item(t) for t in data):
+                return data, False
+        except (ValueError, TypeError, KeyError, AttributeError):
+            pass  # ValueError 包括 JSONDecodeError 和 UnicodeDecodeError
+        suffix = ".corrupt"
+        if os.path.exists(self.journal.snapshot_path + suffix):
+            suffix += time.strftime("-%Y%m%d-%H%M%S")  # 不覆盖更早的备份
+        backup = self.journal.snapshot_path + suffix
+        for path in (self.journal.snapshot_path, self.journal.log_path):
+            try:
+                os.replace(path, path + suffix)
+            except FileNotFoundError:
+                pass
+        self.corrupt.put(backup)
+        return self.journal.load(), True
+
+    def load(self):
+        """启动时读取；旧数据没有 id 的任务在锁内补上 id 并写回，避免各实例各自分配"""
+        with self.lock:
+            data, _ = self._read()
+            if any("id" not in t for t in data):
+                for task in data:
+                    if "id" not in task:
+                        task["id"] = new_task_id()
+                self.journal.compact(data)
+            self.base = {t["id"] for t in data}
+            self._known = self._stat()
+            self._external = False
+            return data
+
+    def sync(self, local):
+        """在后台线程调用：与文件三方合并，有差异时写回，合并结果交给界面线程"""
+        with self.lock:
+            disk, corrupt = self._read()
+            if corrupt:
+                self.base = set()  # 文件中的任务已无从得知，本实例的任务全部保留
+            merged = merge_tasks(local, disk, self.base)
+            fields = _fields(merged)
+            if fields != _fields(disk) or self.journal.needs_compaction():
+                self.journal.compact(merged)
+            self.base = {t["id"] for t in merged}
+            self._known = self._stat()
+            self._external = False
+        if fields != _fields(local):
+            self.results.put((local, merged))
+
+    def append(self, records):
+        """在后台线程调用：在锁内追加一批日志记录"""
+        with self.lock:
+            if self._stat() != self._known:
+                self._external = True
+            self.journal.append(records)
+            self._known = self._stat()
+            # 追加的修改已在文件中，同步基准随之更新，否则会被当作对方的删除/新增
+            for record in records:
+                if record["op"] == "add":
+                    self.base.add(record["id"])
+                elif record["op"] == "del":
+                    self.base.difference_update(record["ids"])
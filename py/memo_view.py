@@ -0,0 +1,247 @@
+import tkinter as tk
+
+from ui_scheduler import PRIORITY_LAYOUT
+
+
+class VirtualTaskList(tk.Frame):
+    """虚拟化任务列表：只为可见行（加少量预渲染行）创建控件，滚动时循环复用"""
+
+    def __init__(self, parent, count, get_task, key, on_toggle, on_context,
+                 font, row_height=46, overscan=3, scheduler=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.scheduler = scheduler    # FrameScheduler：缩放时每帧只重排一次
+        self.count = count            # () -> 任务总数
+        self.get_task = get_task      # (index) -> {"text", "done"}
+        self.key = key                # (index) -> 任务的稳定键值，用于行比对
+        self.on_toggle = on_toggle    # (index, done)
+        self.on_context = on_context  # (index)
+        self.font = font
+        self.row_height = row_height
+        self.overscan = overscan
+
+        self.offset = 0  # 顶部滚动偏移（像素）
+        self.select_mode = False
+        self.selected = set()  # 选中任务的键值
+        self.rows = []  # 可复用的行控件池
+
+        bg = kwargs.get("bg", "#f8f9fa")
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.viewport = tk.Frame(self, bg=bg)
+        self.viewport.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.viewport.bind("<Configure>", lambda e: self._schedule_refresh())
+        self._bind_wheel(self.viewport)
+
+    # ---------- 滚动 ----------
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel)
+        widget.bind("<Button-4>", lambda e: self.scroll_by(-self.row_height))
+        widget.bind("<Button-5>", lambda e: self.scroll_by(self.row_height))
+
+    def _on_wheel(self, event):
+        steps = -int(event.delta / 120) if abs(event.delta) >= 120 else (-1 if event.delta > 0 else 1)
+        self.scroll_by(steps * self.row_height)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == tk.MOVETO:
+            self.scroll_to(int(float(value) * self._total_height()))
+        elif action == tk.SCROLL:
+            step = self.viewport.winfo_height() if unit == tk.PAGES else self.row_height
+            self.scroll_by(int(value) * step)
+
+    def _total_height(self):
+        return self.count() * self.row_height
+
+    def _max_offset(self):
+        return max(0, self._total_height() - self.viewport.winfo_height())
+
+    def scroll_by(self, delta):
+        self.scroll_to(self.offset + delta)
+
+    def scroll_to(self, offset):
+        offset = max(0, min(int(offset), self._max_offset()))
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh()
+
+    def see(self, index):
+        """滚动使第 index 行可见"""
+        top = index * self.row_height
+        height = self.viewport.winfo_height()
+        if top < self.offset:
+            self.scroll_to(top)
+        elif top + self.row_height > self.offset + height:
+            self.scroll_to(top + self.row_height - height)
+
+    # ---------- 行控件池 ----------
+    def _create_row(self):
+        row = tk.Frame(self.viewport, relief="ridge", bd=1)
+        row.index = None
+        row.key = None
+        row.state = None
+        row.geometry = None
+        row.sel_shown = False
+        row.var_done = tk.BooleanVar(value=False)
+        row.cb_done = tk.Checkbutton(
+            row,
+            variable=row.var_done,
+            font=self.font,
+            anchor='w',
+            justify='left',
+            padx=15,
+            pady=8,
+            command=lambda r=row: self.on_toggle(r.index, r.var_done.get())
+        )
+        row.cb_done.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        row.cb_done.bind("<Button-3>", lambda e, r=row: self.on_context(r.index))
+
+        row.var_sel = tk.BooleanVar(value=False)
+        row.sel_container = tk.Frame(row)
+        row.sel_box = tk.Checkbutton(row.sel_container, variable=row.var_sel, bg="white",
+                                     selectcolor="#fff3e0",
+                                     command=lambda r=row: self._on_select(r))
+        row.sel_box.pack()
+
+        for widget in (row, row.cb_done, row.sel_box):
+            self._bind_wheel(widget)
+        self.rows.append(row)
+        return row
+
+    def _bind_row(self, row, index, key):
+        """只在内容变化时才重新配置控件"""
+        row.index = index
+        task = self.get_task(index)
+        if row.key != key:
+            row.key = key
+            row.state = None
+        state = (task["text"], task["done"])
+        if row.state != state:
+            row.state = state
+            text, done = state
+            row.var_done.set(done)
+            row.cb_done.config(
+                text=f"  {text}",
+                bg="#e8f5e8" if not done else "#f5f5f5",
+                selectcolor="#c8e6c9" if not done else "#e0e0e0",
+                fg="#9e9e9e" if done else "black",
+                relief="sunken" if done else "flat"
+            )
+        self._bind_select(row)
+
+    def _bind_select(self, row):
+        if self.select_mode:
+            checked = row.key in self.selected
+            if row.var_sel.get() != checked:
+                row.var_sel.set(checked)
+            if not row.sel_shown:
+                row.sel_container.pack(side=tk.RIGHT, padx=5, pady=5)
+                row.sel_shown = True
+        elif row.sel_shown:
+            row.sel_container.pack_forget()
+            row.sel_shown = False
+
+    def _place_row(self, row, y, width):
+        if row.geometry != (y, width):
+            row.geometry = (y, width)
+            row.place(x=5, y=y, width=width, height=self.row_height - 4)
+
+    def _hide_row(self, row):
+        row.index = None
+        row.key = None
+        row.state = None
+        if row.geometry is not None:
+            row.geometry = None
+            row.place_forget()
+
+    def _on_select(self, row):
+        if row.var_sel.get():
+            self.selected.add(row.key)
+        else:
+            self.selected.discard(row.key)
+
+    # ---------- 渲染 ----------
+    def refresh(self):
+        """按键值比对可见行：仍可见的行原样保留，只有新进入视口的行才重新绑定"""
+        height = self.viewport.winfo_height()
+        total = self.count()
+        self.offset = max(0, min(self.offset, self._max_offset()))
+
+        first = max(0, self.offset // self.row_height - self.overscan)
+        last = min(total, (self.offset + height) // self.row_height + 1 + self.overscan)
+        wanted = {self.key(index): index for index in range(first, last)}
+
+        # 复用仍在窗口内的行，其余行进入空闲池
+        bound = {}
+        free = []
+        for row in self.rows:
+            if row.key in wanted and row.key not in bound:
+                bound[row.key] = row
+            else:
+                free.append(row)
+        while len(free) < len(wanted) - len(bound):
+            free.append(self._create_row())
+
+        width = max(1, self.viewport.winfo_width() - 10)
+        for key, index in wanted.items():
+            row = bound.get(key)
+            if row is None:
+                row = free.pop()
+                self._bind_row(row, index, key)
+            else:
+                row.index = index
+            self._place_row(row, index * self.row_height - self.offset + 2, width)
+        for row in free:
+            if row.key is not None:
+                self._hide_row(row)
+
+        full = self._total_height()
+        if full <= height or full == 0:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / full, (self.offset + height) / full)
+
+    def _schedule_refresh(self):
+        if self.scheduler is None:
+            self.refresh()
+        else:
+            self.scheduler.invalidate(("layout", id(self)),
+                                      lambda: self.winfo_exists() and self.refresh(), PRIORITY_LAYOUT)
+
+    def reset(self):
+        """数据整体替换后调用：清空所有行绑定和选择，再完整渲染可见区"""
+        self.selected.clear()
+        for row in self.rows:
+            self._hide_row(row)
+        self.refresh()
+
+    def keys_changed(self, keys):
+        """任务状态变化：只重新样式化仍在视口内的对应行"""
+        keys = set(keys)
+        for row in self.rows:
+            if row.key in keys:
+                self._bind_row(row, row.index, row.key)
+
+    def rows_inserted(self, index, count=1):
+        """插入任务：视口上方插入时保持当前可见内容不动"""
+        if index * self.row_height < self.offset:
+            self.offset += count * self.row_height
+        self.refresh()
+
+    def rows_removed(self, indices, keys):
+        """删除任务：只回收被删除的行，其余可见行按新位置移动；keys 为被删除任务的键值，同时取消选中"""
+        above = sum(1 for i in indices if i * self.row_height < self.offset)
+        self.offset -= above * self.row_height
+        self.selected.difference_update(keys)
+        self.refresh()
+
+    def set_select_mode(self, enabled):
+        """进入/退出选择模式：只给现有行挂上或移除选择框"""
+        self.select_mode = enabled
+        self.selected.clear()
+        for row in self.rows:
+            if row.key is not None:
+                self._bind_select(row)
+
+    def selected_keys(self):
+        return set(self.selected)
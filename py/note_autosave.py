@@ -0,0 +1,190 @@
+import os
+import struct
+import time
+import zlib
+
+from memo_sync import FileLock
+
+# 反向增量记录头：crc, 时间, 公共前缀长度, 新版本中间段长度, 新版本 crc, 负载长度
+_RECORD = struct.Struct("<IdQQII")
+_LATEST_HEADER = struct.Struct("<Id")  # 最新版本文件头：文本 crc, 时间
+
+
+def _crc(text):
+    return zlib.crc32(text.encode("utf-8"))
+
+
+def _common_prefix(a, b):
+    """二分比较切片（底层 memcmp），避免逐字符的 Python 循环"""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a, b, limit):
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:len(a) - lo] == b[len(b) - mid:len(b) - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+class NoteHistory:
+    """记事本自动保存与版本历史
+
+    note_latest.z 保存最新版本（压缩），note_history.log 追加反向增量：
+    每条记录描述如何从较新版本还原出上一版本，大小只与改动量有关。
+    先追加增量再替换最新版本；若两步之间崩溃，启动时按 crc 丢弃多出的记录。
+    多个实例共用同一目录：读写都在文件锁内，其他实例保存过时先以文件中的版本为基准。
+    """
+
+    def __init__(self, directory, max_versions=200):
+        self.directory = directory
+        self.latest_path = os.path.join(directory, "note_latest.z")
+        self.log_path = os.path.join(directory, "note_history.log")
+        self.max_versions = max_versions
+        os.makedirs(directory, exist_ok=True)
+        self._lock = FileLock(os.path.join(directory, "note_history.lock"))
+        self._latest = ""
+        self._latest_time = 0.0
+        self._latest_crc = _crc("")
+        self._records = []  # [(offset, size, timestamp)]，按时间先后
+
+    def load(self):
+        """读取最新版本（崩溃后恢复用）并索引历史记录，不解压历史内容"""
+        with self._lock:
+            self._reload()
+            return self._latest
+
+    def _reload(self):
+        """持锁时调用：读取最新版本；文件损坏时历史增量已无法还原，从空白重新开始"""
+        try:
+            with open(self.latest_path, "rb") as f:
+                raw = f.read()
+            crc, latest_time = _LATEST_HEADER.unpack_from(raw)
+            latest = zlib.decompress(raw[_LATEST_HEADER.size:]).decode("utf-8")
+            if _crc(latest) != crc:
+                raise ValueError("note_latest.z 校验失败")
+        except (FileNotFoundError, ValueError, struct.error, zlib.error):
+            latest, latest_time, crc = "", 0.0, _crc("")
+        self._latest, self._latest_time, self._latest_crc = latest, latest_time, crc
+        self._index_log(crc)
+
+    def _rebase(self):
+        """持锁时调用：最新版本文件已被其他实例替换时重新读取，增量接在文件中的版本后面"""
+        try:
+            with open(self.latest_path, "rb") as f:
+                header = f.read(_LATEST_HEADER.size)
+        except FileNotFoundError:
+            header = b""
+        current = _LATEST_HEADER.pack(self._latest_crc, self._latest_time) if self._latest_time else b""
+        if header != current:
+            self._reload()
+
+    def _index_log(self, latest_crc):
+        self._records = []
+        try:
+            f = open(self.log_path, "rb+")
+        except FileNotFoundError:
+            return
+        with f:
+            data = f.read()
+            pos = 0
+            while pos + _RECORD.size <= len(data):
+                crc, ts, _, _, new_crc, size = _RECORD.unpack_from(data, pos)
+                end = pos + _RECORD.size + size
+                if end > len(data) or zlib.crc32(data[pos + 4:end]) != crc:
+                    break  # 写了一半的记录
+                self._records.append((pos, end - pos, ts, new_crc))
+                pos = end
+            # 最后一条记录必须指向当前最新版本，否则是替换最新版本前崩溃留下的
+            while self._records and self._records[-1][3] != latest_crc:
+                pos = self._records.pop()[0]
+            if pos < len(data):
+                f.truncate(pos)
+        self._records = [(off, size, ts) for off, size, ts, _ in self._records]
+
+    def save(self, text):
+        """保存新版本（在后台线程调用）：追加一条反向增量，再原子替换最新版本"""
+        with self._lock:
+            self._rebase()
+            old = self._latest
+            if text == old and self._latest_time:
+                return
+            now = time.time()
+            new_crc = _crc(text)
+            if self._latest_time:
+                prefix = _common_prefix(old, text)
+                limit = min(len(old), len(text)) - prefix
+                suffix = _common_suffix(old, text, limit)
+                old_mid = old[prefix:len(old) - suffix]
+                new_mid_len = len(text) - prefix - suffix
+                payload = zlib.compress(old_mid.encode("utf-8"))
+                body = _RECORD.pack(0, self._latest_time, prefix, new_mid_len, new_crc,
+                                    len(payload))[4:] + payload
+                record = struct.pack("<I", zlib.crc32(body)) + body
+                with open(self.log_path, "ab") as f:
+                    offset = f.tell()
+                    f.write(record)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._records.append((offset, len(record), self._latest_time))
+
+            tmp_path = self.latest_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(_LATEST_HEADER.pack(new_crc, now))
+                f.write(zlib.compress(text.encode("utf-8"), 1))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.latest_path)
+            self._latest = text
+            self._latest_time = now
+            self._latest_crc = new_crc
+
+            if len(self._records) > self.max_versions:
+                self._trim()
+
+    def _trim(self):
+        """只保留最近 max_versions 条历史"""
+        drop = len(self._records) - self.max_versions
+        start = self._records[drop][0]
+        with open(self.log_path, "rb") as f:
+            f.seek(start)
+            rest = f.read()
+        tmp_path = self.log_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(rest)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.log_path)
+        self._records = [(off - start, size, ts) for off, size, ts in self._records[drop:]]
+
+    def versions(self):
+        """历史版本的保存时间，下标 0 为最新版本"""
+        with self._lock:
+            self._rebase()
+            return [self._latest_time] + [ts for _, _, ts in reversed(self._records)]
+
+    def restore(self, k):
+        """还原第 k 个版本的文本（0 为最新）"""
+        with self._lock:
+            self._rebase()
+            text = self._latest
+            if k <= 0:
+                return text
+            with open(self.log_path, "rb") as f:
+                for offset, size, _ in reversed(self._records[-k:]):
+                    f.seek(offset)
+                    raw = f.read(size)
+                    _, _, prefix, new_mid_len, _, _ = _RECORD.unpack_from(raw)
+                    old_mid = zlib.decompress(raw[_RECORD.size:]).decode("utf-8")
+                    text = text[:prefix] + old_mid + text[prefix + new_mid_len:]
+            return text
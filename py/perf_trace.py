@@ -0,0 +1,201 @@
+import functools
+import json
+import time
+import tkinter as tk
+from collections import deque
+
+RING_SIZE = 4096           # 环形缓冲区保留的记录数
+HEARTBEAT_MS = 100         # 心跳间隔
+STALL_MS = 80              # 心跳比预期晚到超过该值即记为一次卡顿
+
+
+class _Span:
+    """一次计时：with 结束时写入环形缓冲区；set() 追加控件数、字节数等指标"""
+
+    __slots__ = ("tracer", "name", "fields", "start")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+        self.fields = None
+        self.start = 0.0
+
+    def set(self, **fields):
+        if self.fields is None:
+            self.fields = fields
+        else:
+            self.fields.update(fields)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, self.start, time.perf_counter(), self.fields)
+        return False
+
+
+class _NullSpan:
+    """关闭记录时使用的空计时，布尔值为假，调用方可据此跳过指标计算"""
+
+    __slots__ = ()
+
+    def set(self, **fields):
+        pass
+
+    def __bool__(self):
+        return False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """热点路径计时：关闭时每次调用只多一次属性判断
+
+    记录为 (名称, 时间戳, 耗时毫秒, 指标字典或 None)，存放在定长 deque 中，
+    后台线程也可以直接写入（deque.append 是原子操作）。
+    """
+
+    def __init__(self, size=RING_SIZE):
+        self.enabled = False
+        self.records = deque(maxlen=size)
+        self._heartbeat_id = None
+        self._root = None
+        self._expected = 0.0
+
+    def span(self, name):
+        return _Span(self, name) if self.enabled else _NULL_SPAN
+
+    def record(self, name, start, end, fields=None):
+        self.records.append((name, time.time(), (end - start) * 1000, fields))
+
+    def enable(self, root):
+        """开始记录，并用 after 心跳检测事件循环卡顿"""
+        if self.enabled:
+            return
+        self.enabled = True
+        self._root = root
+        self._expected = time.perf_counter() + HEARTBEAT_MS / 1000
+        self._heartbeat_id = root.after(HEARTBEAT_MS, self._heartbeat)
+
+    def disable(self):
+        self.enabled = False
+        if self._heartbeat_id is not None:
+            self._root.after_cancel(self._heartbeat_id)
+            self._heartbeat_id = None
+
+    def _heartbeat(self):
+        now = time.perf_counter()
+        late = (now - self._expected) * 1000
+        if late > STALL_MS:
+            # 心跳晚到说明这段时间事件循环被占用，界面无响应
+            self.records.append(("stall", time.time(), late, None))
+        self._expected = now + HEARTBEAT_MS / 1000
+        self._heartbeat_id = self._root.after(HEARTBEAT_MS, self._heartbeat)
+
+    def snapshot(self):
+        while True:
+            try:
+                return list(self.records)
+            except RuntimeError:
+                pass  # 复制时后台线程恰好写入，重试即可
+
+    def summary(self):
+        """按名称统计次数和 p50/p95/p99/最大耗时"""
+        groups = {}
+        for name, _, ms, _ in self.snapshot():
+            groups.setdefault(name, []).append(ms)
+        result = {}
+        for name, values in groups.items():
+            values.sort()
+            result[name] = {
+                "count": len(values),
+                "p50": _percentile(values, 50),
+                "p95": _percentile(values, 95),
+                "p99": _percentile(values, 99),
+                "max": values[-1],
+            }
+        return result
+
+    def export_jsonl(self, path):
+        """每条记录一行 JSON，返回写出的条数"""
+        records = self.snapshot()
+        with open(path, "w", encoding="utf-8") as f:
+            for name, ts, ms, fields in records:
+                item = {"name": name, "ts": round(ts, 6), "ms": round(ms, 3)}
+                if fields:
+                    item.update(fields)
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        return len(records)
+
+
+def _percentile(sorted_values, p):
+    """最近秩法百分位数"""
+    index = max(0, -(-len(sorted_values) * p // 100) - 1)
+    return sorted_values[int(index)]
+
+
+TRACER = Tracer()
+
+
+def traced(name, metrics=None):
+    """方法计时装饰器；metrics(self, *args) 返回附加指标，只在记录开启时才计算"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            if not TRACER.enabled:
+                return fn(self, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(self, *args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                TRACER.record(name, start, end, metrics(self, *args, **kwargs) if metrics else None)
+        return wrapper
+    return decorate
+
+
+def count_widgets(widget):
+    """递归统计控件数量"""
+    total = 0
+    stack = [widget]
+    while stack:
+        children = stack.pop().winfo_children()
+        total += len(children)
+        stack.extend(children)
+    return total
+
+
+class PerfOverlay(tk.Toplevel):
+    """置顶的性能面板：每 500ms 刷新一次各热点路径的耗时分位数"""
+
+    def __init__(self, parent, tracer=TRACER, interval=500):
+        super().__init__(parent)
+        self.tracer = tracer
+        self.interval = interval
+        self.title("📈 性能面板")
+        self.geometry("460x260")
+        self.attributes('-topmost', True)
+        self.label = tk.Label(self, font=("Consolas", 10), justify=tk.LEFT, anchor="nw",
+                              bg="#263238", fg="#eceff1", padx=10, pady=10)
+        self.label.pack(fill=tk.BOTH, expand=True)
+        self._refresh()
+
+    def _refresh(self):
+        if not self.winfo_exists():
+            return
+        lines = [f"{'名称':<16}{'次数':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'最大':>9}"]
+        for name, s in sorted(self.tracer.summary().items()):
+            lines.append(f"{name:<18}{s['count']:>6}{s['p50']:>9.1f}{s['p95']:>9.1f}"
+                         f"{s['p99']:>9.1f}{s['max']:>9.1f}")
+        if not self.tracer.enabled:
+            lines.append("\n（记录已关闭）")
+        self.label.config(text="\n".join(lines))
+        self.after(self.interval, self._refresh)
@@ -0,0 +1,121 @@
+import importlib
+import json
+import os
+import sys
+import time
+
+
+class LazyModule:
+    """模块代理：第一次访问属性时才真正导入（打包时需在 hiddenimports 中列出）"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+def _process_age():
+    """进程已运行的秒数（从操作系统创建进程算起），取不到时返回 None"""
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/self/stat", "rb") as f:
+                # 第 22 个字段是进程启动时刻（开机后的时钟滴答数），进程名可能含空格，从右括号后开始数
+                start_ticks = int(f.read().rsplit(b")", 1)[1].split()[19])
+            with open("/proc/uptime", "rb") as f:
+                uptime = float(f.read().split()[0])
+            return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+        if os.name == "nt":
+            import ctypes
+            from ctypes import wintypes
+            times = [wintypes.FILETIME() for _ in range(4)]
+            kernel32 = ctypes.windll.kernel32
+            if not kernel32.GetProcessTimes(kernel32.GetCurrentProcess(), *map(ctypes.byref, times)):
+                return None
+            created = (times[0].dwHighDateTime << 32 | times[0].dwLowDateTime) / 1e7 - 11644473600
+            return time.time() - created
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    return None
+
+
+class StartupTimer:
+    """冷启动分阶段计时：导入、Tk 初始化、界面创建、首次绘制、备忘录加载
+
+    mark(name) 记录从上一阶段结束到现在的一段；phase(name) 用 with 包住不连续的一段。
+    """
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.phases = []  # (名称, 开始, 结束)，perf_counter 秒
+        self._last = self.start
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, self._last, now))
+        self._last = now
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def report(self):
+        """各阶段毫秒数；before_main 为进程创建到执行脚本第一行（解释器启动、打包版解压）"""
+        age = _process_age()
+        before_main = None
+        if age is not None:
+            before_main = max(0.0, age - (time.perf_counter() - self.start)) * 1000
+        return {
+            "frozen": bool(getattr(sys, "frozen", False)),
+            "before_main_ms": None if before_main is None else round(before_main, 1),
+            "phases": [{"name": name, "ms": round((end - begin) * 1000, 1),
+                        "at_ms": round((end - self.start) * 1000, 1)}
+                       for name, begin, end in self.phases],
+        }
+
+    def format(self):
+        report = self.report()
+        lines = []
+        if report["before_main_ms"] is not None:
+            lines.append(f"{'before_main':<14}{report['before_main_ms']:>9.1f} ms")
+        for item in report["phases"]:
+            lines.append(f"{item['name']:<14}{item['ms']:>9.1f} ms   （第 {item['at_ms']:.0f} ms）")
+        lines.append("（打包版）" if report["frozen"] else "（源码运行）")
+        return "\n".join(lines)
+
+    def write(self, path):
+        """写出 JSON 报告；path 为 "-" 时输出到标准输出（无控制台的打包版写到 startup_report.json）"""
+        text = json.dumps(self.report(), ensure_ascii=False, indent=2)
+        if path == "-" and sys.stdout is None:
+            path = "startup_report.json"
+        if path == "-":
+            print(text)
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def record_to(self, tracer):
+        """把各阶段写入性能记录，便于和其他热点一起导出"""
+        for name, begin, end in self.phases:
+            tracer.record("startup." + name, begin, end)
+
+
+class _Phase:
+    __slots__ = ("timer", "name", "begin")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+        self.begin = 0.0
+
+    def __enter__(self):
+        self.begin = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.timer.phases.append((self.name, self.begin, end))
+        self.timer._last = end
+        return False
@@ -0,0 +1,37 @@
+"""增量同步协议：客户端 delta_sync 与参考服务器 sync_server 共用，不依赖 tkinter
+
+请求和响应都是 zlib 压缩的 JSON（Content-Encoding: deflate），POST 到 /sync：
+    请求 {"v": 1, "client": 客户端 id, "cursor": 已取到的版本, "changes": [记录], "limit": 条数}
+    响应 {"cursor": 新版本, "changes": [记录], "more": 是否还有未取完的变更}
+记录为 {"id", "text", "text_ts", "done", "done_ts", "deleted_ts"}；客户端上传删除时只需 {"id", "deleted_ts"}。
+"""
+import json
+import zlib
+
+PROTOCOL = 1
+
+
+def merge_record(a, b):
+    """合并同一任务的两个版本：文本、完成状态各取 (修改时间, 值) 较大者，删除标记取较大的删除时间
+
+    逐字段取最大值满足交换律、结合律和幂等，服务器和各客户端无论以什么顺序收到修改，
+    合并结果都相同。删除优先：任何一方删除过的任务保持删除。
+    """
+    if a is None:
+        a = b
+    return {
+        "id": b["id"],
+        "text": max((a.get("text_ts", -1), a.get("text", "")), (b.get("text_ts", -1), b.get("text", "")))[1],
+        "text_ts": max(a.get("text_ts", -1), b.get("text_ts", -1)),
+        "done": max((a.get("done_ts", -1), a.get("done", False)), (b.get("done_ts", -1), b.get("done", False)))[1],
+        "done_ts": max(a.get("done_ts", -1), b.get("done_ts", -1)),
+        "deleted_ts": max(a.get("deleted_ts", 0), b.get("deleted_ts", 0)),
+    }
+
+
+def encode_body(data):
+    return zlib.compress(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def decode_body(body):
+    return json.loads(zlib.decompress(body).decode("utf-8"))
@@ -0,0 +1,148 @@
+"""增量同步的参考服务器（本地测试用）
+
+用 SQLite 保存每个任务合并后的最新状态和版本号；每次收到修改都用 merge_record 合并，
+结果有变化时分配新的全局版本号。客户端用 cursor 只取比它新的版本，带宽与修改数成正比。
+
+    python sync_server.py --port 8765 --db sync_server.db
+    python 记事本便签.py --sync-server http://127.0.0.1:8765
+"""
+import argparse
+import sqlite3
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sync_protocol import PROTOCOL, decode_body, encode_body, merge_record
+
+MAX_LIMIT = 2000
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id         INTEGER PRIMARY KEY,
+    text       TEXT    NOT NULL,
+    text_ts    REAL    NOT NULL,
+    done       INTEGER NOT NULL,
+    done_ts    REAL    NOT NULL,
+    deleted_ts REAL    NOT NULL,
+    version    INTEGER NOT NULL,
+    origin     TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_version ON tasks (version);
+"""
+
+
+class SyncStore:
+    """服务器端状态：tasks 表每个任务一行，version 为最后一次改变它的全局版本号
+
+    origin 记录这次改变是否完全来自某个客户端的上传，拉取时跳过该客户端自己的修改。
+    删除的任务保留为墓碑，晚到的旧修改不会让它重新出现。
+    """
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    def _version(self):
+        return self.conn.execute("SELECT COALESCE(MAX(version), 0) FROM tasks").fetchone()[0]
+
+    def _get(self, key):
+        row = self.conn.execute(
+            "SELECT id, text, text_ts, done, done_ts, deleted_ts FROM tasks WHERE id = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "text": row[1], "text_ts": row[2], "done": bool(row[3]),
+                "done_ts": row[4], "deleted_ts": row[5]}
+
+    def sync(self, client, cursor, changes, limit):
+        """合并上传的修改，返回 cursor 之后其他客户端造成的变更"""
+        with self.lock, self.conn:
+            version = self._version()
+            for change in changes:
+                old = self._get(change["id"])
+                merged = merge_record(old, change)
+                if merged == old:
+                    continue
+                version += 1
+                # 合并结果就是该客户端上传的内容（或删除）时，它不需要再取回
+                own = merged == merge_record(None, change) or (merged["deleted_ts"] and change.get("deleted_ts"))
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO tasks (id, text, text_ts, done, done_ts, deleted_ts, version, origin)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (merged["id"], merged["text"], merged["text_ts"], int(merged["done"]), merged["done_ts"],
+                     merged["deleted_ts"], version, client if own else None))
+            rows = self.conn.execute(
+                "SELECT id, text, text_ts, done, done_ts, deleted_ts, version FROM tasks"
+                " WHERE version > ? AND (origin IS NULL OR origin != ?) ORDER BY version LIMIT ?",
+                (cursor, client, limit)).fetchall()
+        more = len(rows) == limit
+        return {
+            "cursor": rows[-1][6] if more else version,
+            "changes": [{"id": r[0], "text": r[1], "text_ts": r[2], "done": bool(r[3]), "done_ts": r[4],
+                         "deleted_ts": r[5]} for r in rows],
+            "more": more,
+        }
+
+
+class SyncHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if self.path != "/sync":
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self.send_error(413)
+            return
+        try:
+            request = decode_body(self.rfile.read(length))
+            if request.get("v") != PROTOCOL:
+                raise ValueError("协议版本不一致")
+            changes = request["changes"]
+            if not all(isinstance(c, dict) and isinstance(c.get("id"), int) for c in changes):
+                raise ValueError("记录缺少 id")
+            reply = self.server.store.sync(str(request["client"]), int(request["cursor"]), changes,
+                                           max(1, min(int(request.get("limit", MAX_LIMIT)), MAX_LIMIT)))
+        except (ValueError, KeyError, TypeError, zlib.error) as e:
+            self.send_error(400, str(e))
+            return
+        body = encode_body(reply)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Encoding", "deflate")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(db_path, host="127.0.0.1", port=8765, verbose=False):
+    server = ThreadingHTTPServer((host, port), SyncHandler)
+    server.store = SyncStore(db_path)
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="记事本便签增量同步参考服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", default="sync_server.db", help="服务器数据文件")
+    parser.add_argument("-v", "--verbose", action="store_true", help="输出每个请求")
+    args = parser.parse_args()
+    server = make_server(args.db, args.host, args.port, args.verbose)
+    print(f"同步服务器已启动: http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import itertools
+import sys
+import time
+
+PRIORITY_VISUAL = 0   # 透明度等直接可见的窗口属性
+PRIORITY_LAYOUT = 1   # 列表筛选、视图重新布局
+PRIORITY_STATS = 2    # 统计标签等文字
+PRIORITY_PERSIST = 3  # 日志追加、保存
+
+FRAME_MS = 16
+
+
+class FrameScheduler:
+    """按帧合并界面更新：同名的失效请求在一帧内只执行最后一次
+
+    高频事件（拖动滑块、连续点击、窗口缩放、输入）只登记要做的工作，
+    在事件处理完后（after_idle）或下一帧（after）统一按优先级执行一次。
+    """
+
+    def __init__(self, root, frame_ms=FRAME_MS):
+        self.root = root
+        self.frame_ms = frame_ms
+        self._jobs = {}  # 名称 -> (优先级, 登记顺序, 回调)
+        self._order = itertools.count()
+        self._after_id = None
+        self._last_flush = 0.0
+
+    def invalidate(self, name, fn, priority=PRIORITY_LAYOUT):
+        """登记一项工作；同名工作尚未执行时只替换回调，保留原来的先后顺序"""
+        old = self._jobs.get(name)
+        self._jobs[name] = (priority, old[1] if old else next(self._order), fn)
+        if self._after_id is None:
+            wait = self.frame_ms - (time.perf_counter() - self._last_flush) * 1000
+            if wait > 1:
+                self._after_id = self.root.after(int(wait), self._flush)
+            else:
+                self._after_id = self.root.after_idle(self._flush)
+
+    def flush(self):
+        """立即执行所有待办工作（关闭窗口前调用）"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._flush()
+
+    def _flush(self):
+        self._after_id = None
+        self._last_flush = time.perf_counter()
+        jobs = sorted(self._jobs.values(), key=lambda job: job[:2])
+        self._jobs = {}
+        # 执行期间新登记的工作留到下一帧
+        for _, _, fn in jobs:
+            try:
+                fn()
+            except Exception:
+                self.root.report_callback_exception(*sys.exc_info())
@@ -1,13 +1,37 @@
+import time
+_START = time.perf_counter()  # 启动计时起点：之后的导入计入 import 阶段
+
 import tkinter as tk
-from tkinter import filedialog, messagebox
 import os
-import json
+import queue
 import sys
 
+from memo_journal import MemoJournal
+from memo_model import MemoStore, dump_tasks_json
+from memo_persist import PersistWorker
+from memo_search import SearchIndexer
+from memo_sync import MemoSync
+from note_autosave import NoteHistory
+from perf_trace import TRACER, PerfOverlay, count_widgets, traced
+from startup import LazyModule, StartupTimer
+from ui_scheduler import PRIORITY_LAYOUT, PRIORITY_PERSIST, PRIORITY_STATS, PRIORITY_VISUAL, FrameScheduler
+
+# 对话框模块第一次弹框时才导入；大文件、导入、SQLite、二进制快照等模块在用到的方法里导入
+filedialog = LazyModule("tkinter.filedialog")
+messagebox = LazyModule("tkinter.messagebox")
+simpledialog = LazyModule("tkinter.simpledialog")
+
+SAVE_DELAY_MS = 400      # 最后一次修改后等待多久再写盘
+SAVE_MAX_DELAY_MS = 3000  # 连续修改时最多推迟多久
+SYNC_POLL_MS = 1000       # 检查其他实例是否修改了备忘录文件的间隔
+DELTA_POLL_MS = 500       # 检查同步服务器是否取回了新变更的间隔
+AUTOSAVE_DELAY_MS = 1500  # 记事本首次修改后多久自动保存
+
 
 class TopNotepad:
-    def __init__(self, root):
+    def __init__(self, root, store="json", trace=False, startup=None, sync_url=None):
         self.root = root
+        self.startup = startup or StartupTimer()
         self.root.title("📝 记事本便签")
         self.root.geometry("500x620")
         self.root.attributes("-topmost", True)
@@ -22,11 +46,17 @@ class TopNotepad:
         self.small_font = ("Microsoft YaHei", 10)
 
         # 初始化变量
-        self.mode = "note"
+        self.mode = None
+        self.mode_frames = {}  # 模式 -> 已创建的界面（首次进入时创建，之后只切换显示）
         self.filename = None
-        self.memo_data = []
+        self.memo = None  # MemoStore 或 SqliteMemoStore
         self.note_content = ""
         self.select_mode = False
+        self.search = SearchIndexer()  # 首次搜索时才在后台建立索引
+        self.filter_keys = None  # 搜索/筛选结果（键值列表），None 表示显示全部
+        self._filter_after_id = None
+        self.scheduler = FrameScheduler(self.root)  # 高频事件引起的更新按帧合并
+        self._pending_records = []  # 本帧内待追加的日志记录
 
         # 控件引用
         self.entry = None
@@ -34,39 +64,384 @@ class TopNotepad:
         self.del_selected_btn = None
         self.task_frame = None
         self.text = None
+        self.note_frame = None
+        self.large_doc = None  # 只读分页打开的大文件
+        self.large_view = None
         self.stats_label = None  # ✅ 新增统计标签引用
+        self.search_var = None
+        self.filter_var = None
 
         # 加载备忘录长期记忆
         self.memo_file = "memo_data.json"
-        self.load_memo_data()
+        self.memo_db = "memo_data.db"
+        self.memo_bin = "memo_data.bin"
+        self.journal = MemoJournal(self.memo_file)
+        self.sync = MemoSync(self.journal)  # 多个实例共享同一份文件：加锁读改写并合并
+        self._applying_remote = False
+        self.sync_url = sync_url  # 增量同步服务器地址（--sync-server），None 表示不同步
+        self.delta = None
+        self._applying_server = False
+        self.store = store  # json 整体保存 / journal 追加日志 / sqlite 数据库 / binary 二进制快照
+        self.report_path = None  # 启动报告输出位置（--startup-report）
+
+        # 后台写盘：合并连续修改，写入不阻塞界面
+        self.persist = PersistWorker()
+        self._save_after_id = None
+        self._save_deadline = 0
+        self.root.after(500, self.poll_save_errors)
+
+        # 记事本自动保存：崩溃或直接关闭后下次启动自动恢复
+        self.note_history = NoteHistory("note_history")
+        self._autosave_after_id = None
+        try:
+            self.note_content = self.note_history.load()
+        except Exception:
+            self.note_content = ""
+
+        # 性能记录（默认关闭，关闭时热点路径只多一次判断）
+        self.trace_var = tk.BooleanVar(value=trace)
+        self.perf_overlay = None
+        if trace:
+            TRACER.enable(self.root)
 
         # 创建菜单
         self.create_menu()
         self.root.config(menu=self.menu_bar)
 
         # 创建记事本模式界面
-        self.create_note_mode()
+        self.switch_mode("note")
 
         # 绑定退出事件保存备忘录
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.bind("<Control-g>", lambda e: self.goto_line())
+
+        # 备忘录数据推迟到窗口第一次画出之后再加载（进入备忘录模式时若还没加载则立即加载）
+        self._map_binding = self.root.bind("<Map>", self.on_first_map, add="+")
+        self.startup.mark("ui")
+
+    def on_first_map(self, event=None):
+        """窗口映射后，等待本轮重绘完成记下首次绘制，再在空闲时加载备忘录"""
+        self.root.unbind("<Map>", self._map_binding)
+        self.root.after_idle(self.after_first_paint)
+
+    def after_first_paint(self):
+        self.startup.mark("first_paint")
+        # 让事件循环先把画面刷新到屏幕上
+        self.root.after(1, self.finish_startup)
+
+    def finish_startup(self):
+        self.ensure_memo()
+        if TRACER.enabled:
+            self.startup.record_to(TRACER)
+        if self.report_path:
+            try:
+                self.startup.write(self.report_path)
+            except OSError:
+                pass
 
+    def ensure_memo(self):
+        """需要时才加载备忘录，并开始与其他实例同步"""
+        if self.memo is not None:
+            return
+        with self.startup.phase("memo_load"):
+            self.load_memo_data()
+        if self.store in ("json", "journal"):
+            self.root.after(SYNC_POLL_MS, self.poll_memo_sync)
+        elif self.store == "binary" and not os.path.exists(self.memo_bin):
+            self.flush_memo_data()  # 首次使用：把 JSON 中的数据迁移为二进制快照
+        if self.sync_url and self.store != "sqlite":
+            from delta_sync import DeltaSync
+            self.delta = DeltaSync(self.sync_url, "memo_delta_state.json")
+            if self.delta.fresh:
+                self.delta.track(self.memo.export())  # 第一次同步上传全部任务，之后只传修改
+            self.delta.start(self.memo.key(i) for i in range(self.memo.count()))
+            self.root.after(DELTA_POLL_MS, self.poll_delta_sync)
+
+    @traced("load_memo_data", lambda self: {"tasks": self.memo.count()})
     def load_memo_data(self):
-        """加载备忘录数据"""
-        if os.path.exists(self.memo_file):
+        """加载备忘录数据（快照+回放未压缩的日志，或打开 SQLite 数据库 / 二进制快照）"""
+        if self.store == "binary" and os.path.exists(self.memo_bin):
+            from memo_binary import BinarySnapshot
             try:
-                with open(self.memo_file, "r", encoding="utf-8") as f:
-                    self.memo_data = json.load(f)
+                # 只读入定长的列，任务文本在显示或搜索时才解码
+                self.memo = MemoStore.from_records(BinarySnapshot(self.memo_bin).tasks())
+                self.memo.subscribe(self.on_memo_change)
+                return
             except Exception:
-                self.memo_data = []
+                pass  # 快照损坏时退回读取 JSON
+        if self.store == "sqlite":
+            from memo_sqlite import SqliteMemoStore
+            migrate = not os.path.exists(self.memo_db)
+            self.memo = SqliteMemoStore(self.memo_db)
+            if migrate and os.path.exists(self.memo_file):
+                try:
+                    self.memo.replace(self.journal.load())
+                except Exception:
+                    pass
+        else:
+            try:
+                self.memo = MemoStore(self.sync.load())
+            except Exception:
+                self.memo = MemoStore()
+        self.memo.subscribe(self.on_memo_change)
 
+    @traced("save_memo_data")
     def save_memo_data(self):
-        """保存备忘录数据"""
-        with open(self.memo_file, "w", encoding="utf-8") as f:
-            json.dump(self.memo_data, f, ensure_ascii=False, indent=2)
+        """保存备忘录数据（延迟合并，由后台线程原子写入）"""
+        if self.store == "sqlite":
+            return  # 每次修改已在数据库中提交
+        now = time.monotonic() * 1000
+        if self._save_after_id is None:
+            self._save_deadline = now + SAVE_MAX_DELAY_MS
+        else:
+            self.root.after_cancel(self._save_after_id)
+        delay = int(max(0, min(SAVE_DELAY_MS, self._save_deadline - now)))
+        self._save_after_id = self.root.after(delay, self.flush_memo_data)
+
+    def flush_memo_data(self):
+        """立即把当前备忘录快照交给后台线程写盘"""
+        if self._save_after_id is not None:
+            self.root.after_cancel(self._save_after_id)
+            self._save_after_id = None
+        if self.store == "binary":
+            rows = self.memo.snapshot_rows()
+            self.persist.submit(lambda: self._write_binary_snapshot(rows), key="memo")
+            return
+        data = self.collect_tasks()
+        self.persist.submit(lambda: self._write_memo_snapshot(data), key="memo")
+
+    def _write_binary_snapshot(self, rows):
+        """在后台线程写二进制快照；未解码过的文本直接复制原始字节"""
+        from memo_binary import write_snapshot
+        with TRACER.span("memo_write") as span:
+            write_snapshot(self.memo_bin, ((key, task.raw_text(), done, text_ts, done_ts)
+                                           for key, task, done, text_ts, done_ts in rows))
+            if span:
+                span.set(tasks=len(rows), bytes=os.path.getsize(self.memo_bin))
+
+    def _write_memo_snapshot(self, data):
+        """在后台线程与文件合并后写快照；记录开启时记下耗时和写入字节数"""
+        with TRACER.span("memo_write") as span:
+            self.sync.sync(data)
+            if span:
+                span.set(tasks=len(data), bytes=os.path.getsize(self.memo_file))
+
+    def log_changes(self, records):
+        """记录修改：日志模式下逐条追加记录，否则整体保存"""
+        if self.store != "journal":
+            self.save_memo_data()
+            return
+        if records:
+            self.persist.submit(lambda: self.sync.append(records))
+        if self.journal.needs_compaction() and self._save_after_id is None:
+            self.save_memo_data()
+
+    def on_memo_change(self, kind, index=None, indices=None, keys=(), done=None):
+        """存储层修改通知：立即同步搜索索引和可见行，筛选、统计和持久化按帧合并"""
+        if self.delta is not None and not self._applying_server and not self.memo.importing:
+            self.track_delta(kind, index, keys)
+        if kind == "reset":
+            self.reload_tasks()
+            self.save_memo_data()
+            return
+        records = []
+        if kind == "insert":
+            if self.search.ready or self.search.building:
+                # 索引把后加入的任务排在前面，所以从最后一条开始加
+                for i in reversed(range(len(keys))):
+                    self.search.add(keys[i], self.memo.get(index + i)["text"])
+            if self.filter_keys is not None:
+                self.schedule_filter()
+            elif self.task_frame:
+                self.task_frame.rows_inserted(index, len(keys))
+            if self.store == "journal" and not self.memo.importing:  # 导入结束后整体保存一次
+                for i in reversed(range(len(keys))):
+                    records.append(dict(self.memo.get(index + i).to_dict(), op="add"))
+        elif kind == "update":
+            for key in keys:
+                self.search.set_done(key, done)
+            if self.task_frame:
+                self.task_frame.keys_changed(keys)
+            if self.filter_keys is not None and self.filter_var.get() != "all":
+                self.schedule_filter()  # 状态改变后可能不再符合筛选条件
+            if self.store == "journal":
+                records = [{"op": "set", "id": key, "done": done, "ts": self.memo.get_by_key(key).done_ts}
+                           for key in keys]
+        elif kind == "remove":
+            for key in keys:
+                self.search.remove(key)
+            if self.filter_keys is not None:
+                # 删除不会产生新的匹配，直接从结果中去掉即可，不必重新搜索
+                removed = set(keys)
+                self.filter_keys = [key for key in self.filter_keys if key not in removed]
+                self.render_tasks()
+            elif not self.task_frame:
+                pass  # 还没进入过备忘录模式，任务列表创建时直接读取存储层
+            elif indices is None:
+                self.task_frame.reset()
+            else:
+                self.task_frame.rows_removed(set(indices), keys)
+            records = [{"op": "del", "ids": list(keys)}]
+        self.update_stats()
+        if not self.memo.importing and not self._applying_remote:
+            self._pending_records.extend(records)
+            self.scheduler.invalidate("persist", self._flush_records, PRIORITY_PERSIST)
+
+    def _flush_records(self):
+        """每帧把累积的修改一次交给后台（日志模式下一次写入、一次 fsync）"""
+        records, self._pending_records = self._pending_records, []
+        self.log_changes(records)
+
+    def poll_memo_sync(self):
+        """应用后台合并得到的其他实例的修改；发现文件被外部修改时触发一次同步"""
+        try:
+            while not self.memo.importing and not self.sync.results.empty():
+                self.apply_merged(*self.sync.results.get_nowait())
+            if self.sync.changed():
+                self.flush_memo_data()
+            if not self.sync.corrupt.empty():
+                backup = self.sync.corrupt.get_nowait()
+                messagebox.showwarning("⚠️ 数据文件损坏",
+                                       f"备忘录数据文件无法读取，已备份为：\n{backup}\n\n当前任务会重新保存。")
+        finally:
+            # 出错也要继续轮询，否则之后其他实例的修改再也不会被应用
+            self.root.after(SYNC_POLL_MS, self.poll_memo_sync)
+
+    def apply_merged(self, sent, merged):
+        """把合并结果与当时发送的快照比较，只把差异增量应用到存储层
+
+        合并期间本实例的新修改（时间更新）保留不动。
+        """
+        sent_by_id = {t["id"]: t for t in sent}
+        merged_ids = set()
+        added = []
+        toggles = {True: {}, False: {}}
+        for task in merged:
+            key = task["id"]
+            merged_ids.add(key)
+            before = sent_by_id.get(key)
+            if before is None:
+                if not self.memo.has(key):
+                    added.append(task)
+            elif task["done"] != before["done"] and self.memo.has(key):
+                current = self.memo.get_by_key(key)
+                if current.done_ts <= before["done_ts"]:
+                    toggles[task["done"]][key] = task["done_ts"]
+        removed = [key for key in sent_by_id if key not in merged_ids and self.memo.has(key)]
+
+        self._applying_remote = True
+        try:
+            if removed:
+                self.memo.delete_many(removed)
+            for done, stamps in toggles.items():
+                if stamps:
+                    self.memo.toggle_many(stamps, done, stamps)
+            if added:
+                self.memo.prepend(added)
+        finally:
+            self._applying_remote = False
+
+    def track_delta(self, kind, index, keys):
+        """把本地修改记入增量同步的待上传列表（只记改动的任务）"""
+        if kind == "insert":
+            records = [self.memo.get(index + i).to_dict() for i in range(len(keys))]
+        elif kind == "update":
+            records = [self.memo.get_by_key(key).to_dict() for key in keys]
+        elif kind == "remove":
+            now = time.time()
+            records = [{"id": key, "deleted_ts": now} for key in keys]
+        else:
+            # 整体替换或导入结束：与已知的 id 比较找出增删，只有这种少见情况需要遍历全部任务
+            current = {self.memo.key(i) for i in range(self.memo.count())}
+            now = time.time()
+            records = [{"id": key, "deleted_ts": now} for key in self.delta.known - current]
+            records += [self.memo.get_by_key(key).to_dict() for key in current - self.delta.known]
+        if records:
+            self.delta.track(records)
+
+    def poll_delta_sync(self):
+        """应用同步服务器取回的变更；变更写盘之后才确认新的 cursor"""
+        try:
+            while not self.memo.importing and not self.delta.results.empty():
+                cursor, changes = self.delta.results.get_nowait()
+                if changes:
+                    try:
+                        self.apply_server_changes(changes)
+                    except Exception:
+                        self.delta.rewind()  # 没有应用完，不确认，下一次从已确认的 cursor 重新取回
+                        raise
+                    self.scheduler.flush()  # 日志模式下立即把记录交给写盘线程
+                    if self.store != "journal":
+                        self.flush_memo_data()
+                # 整体保存被之后的修改合并时会排到队尾，确认要挂在它后面，写盘成功后才执行；
+                # 日志模式下的追加记录没有 key，按提交顺序排在确认之前
+                self.persist.submit_after("memo", lambda cursor=cursor: self.delta.ack(cursor))
+        finally:
+            self.root.after(DELTA_POLL_MS, self.poll_delta_sync)
+
+    def apply_server_changes(self, changes):
+        """把服务器的合并结果增量应用到存储层
+
+        与本地状态按 merge_record 的规则逐字段合并：本地较新的完成状态保留，随下一次请求上传；
+        本地已删除但还没上传的任务不会被恢复。任务文本创建后不会修改，已有任务只比较完成状态。
+        """
+        removed = []
+        added = []
+        toggles = {True: {}, False: {}}
+        for record in changes:
+            key = record["id"]
+            if record["deleted_ts"]:
+                if self.memo.has(key):
+                    removed.append(key)
+            elif not self.memo.has(key):
+                if not self.delta.deleted_locally(key):
+                    added.append(record)
+            else:
+                task = self.memo.get_by_key(key)
+                done_ts, done = max((task.done_ts, task.done), (record["done_ts"], record["done"]))
+                if done != task.done:
+                    toggles[done][key] = done_ts
+
+        self._applying_server = True
+        try:
+            if removed:
+                self.memo.delete_many(removed)
+                self.delta.known.difference_update(removed)
+            for done, stamps in toggles.items():
+                if stamps:
+                    self.memo.toggle_many(stamps, done, stamps)
+            if added:
+                added.sort(key=lambda record: record["text_ts"], reverse=True)  # 新建的排在前面
+                self.memo.prepend(added)
+                self.delta.known.update(record["id"] for record in added)
+        finally:
+            self._applying_server = False
+
+    def poll_save_errors(self):
+        """把后台写盘错误报告给用户"""
+        errors = []
+        while not self.persist.errors.empty():
+            errors.append(self.persist.errors.get_nowait())
+        if errors:
+            messagebox.showerror("❌ 保存失败", f"后台保存失败：\n{errors[-1]}")
+        self.root.after(500, self.poll_save_errors)
 
     def on_close(self):
-        """关闭窗口时保存备忘录"""
-        self.save_memo_data()
+        """关闭窗口时保存备忘录和记事本"""
+        self.scheduler.flush()
+        if self._save_after_id is not None:
+            self.flush_memo_data()
+        self.autosave_note()
+        if not self.persist.close(timeout=10) or not self.persist.errors.empty():
+            if not messagebox.askyesno("❌ 保存失败", "备忘录未能完整保存，仍要退出吗？"):
+                self.persist = PersistWorker()
+                return
+        if self.delta is not None:
+            self.delta.close(timeout=2)
+        if self.memo is not None:
+            self.memo.close()
+        if self.large_doc:
+            self.large_doc.close()
         self.root.destroy()
 
     def create_menu(self):
@@ -78,8 +453,10 @@ class TopNotepad:
         self.file_menu.add_command(label="新建 (Ctrl+N)", command=self.new_file)
         self.file_menu.add_command(label="打开 (Ctrl+O)", command=self.open_file)
         self.file_menu.add_command(label="保存 (Ctrl+S)", command=self.save_file)
+        self.file_menu.add_command(label="跳转到行 (Ctrl+G)", command=self.goto_line)
+        self.file_menu.add_command(label="🕘 历史版本", command=self.show_note_history)
         self.file_menu.add_separator()
-        self.file_menu.add_command(label="退出", command=self.root.quit)
+        self.file_menu.add_command(label="退出", command=self.on_close)
         self.menu_bar.add_cascade(label="文件", menu=self.file_menu)
 
         # 模式菜单
@@ -88,36 +465,83 @@ class TopNotepad:
         self.mode_menu.add_command(label="✅ 横线备忘录模式", command=lambda: self.switch_mode("memo"))
         self.menu_bar.add_cascade(label="模式", menu=self.mode_menu)
 
-        # 透明度菜单
-        self.transparency_menu = tk.Menu(self.menu_bar, tearoff=0)
-        self.transparency_menu.add_command(label="🔧 透明度调节面板", command=self.show_transparency_panel)
-        self.transparency_menu.add_separator()
-        self.transparency_menu.add_command(label="💎 完全不透明 (100%)", command=lambda: self.set_transparency(1.0))
-        self.transparency_menu.add_command(label="☁️  90% 透明", command=lambda: self.set_transparency(0.90))
-        self.transparency_menu.add_command(label="🌫️  80% 透明", command=lambda: self.set_transparency(0.80))
-        self.transparency_menu.add_command(label="🎭  70% 透明", command=lambda: self.set_transparency(0.70))
-        self.transparency_menu.add_command(label="👻  60% 透明", command=lambda: self.set_transparency(0.60))
-        self.transparency_menu.add_command(label="💨  50% 透明", command=lambda: self.set_transparency(0.50))
-        self.transparency_menu.add_command(label="🫧  40% 透明", command=lambda: self.set_transparency(0.40))
-        self.transparency_menu.add_command(label="🌸  30% 透明", command=lambda: self.set_transparency(0.30))
-        self.menu_bar.add_cascade(label="透明度", menu=self.transparency_menu)
-
-        # 窗口菜单
-        self.window_menu = tk.Menu(self.menu_bar, tearoff=0)
-        self.window_menu.add_command(label="🖥️ 全屏/退出全屏 (F11)", command=self.toggle_fullscreen)
-        self.window_menu.add_command(label="📐 恢复默认大小", command=self.restore_size)
-        self.menu_bar.add_cascade(label="窗口", menu=self.window_menu)
-
-        # 置顶菜单
-        self.top_menu = tk.Menu(self.menu_bar, tearoff=0)
-        self.top_menu.add_command(label="🔒 取消置顶", command=self.toggle_topmost)
-        self.menu_bar.add_cascade(label="置顶", menu=self.top_menu)
+        # 不常用的菜单第一次展开时才创建菜单项
+        self.transparency_menu = self.add_lazy_cascade("透明度", self.build_transparency_menu)
+        self.window_menu = self.add_lazy_cascade("窗口", self.build_window_menu)
+        self.perf_menu = self.add_lazy_cascade("性能", self.build_perf_menu)
+        self.top_menu = self.add_lazy_cascade("置顶", self.build_top_menu)
+
+    def add_lazy_cascade(self, label, build):
+        """添加一个空的下拉菜单，postcommand 在第一次展开前调用 build(menu) 填充"""
+        menu = tk.Menu(self.menu_bar, tearoff=0)
+
+        def populate():
+            menu.config(postcommand="")
+            build(menu)
+        menu.config(postcommand=populate)
+        self.menu_bar.add_cascade(label=label, menu=menu)
+        return menu
+
+    def build_transparency_menu(self, menu):
+        menu.add_command(label="🔧 透明度调节面板", command=self.show_transparency_panel)
+        menu.add_separator()
+        menu.add_command(label="💎 完全不透明 (100%)", command=lambda: self.set_transparency(1.0))
+        menu.add_command(label="☁️  90% 透明", command=lambda: self.set_transparency(0.90))
+        menu.add_command(label="🌫️  80% 透明", command=lambda: self.set_transparency(0.80))
+        menu.add_command(label="🎭  70% 透明", command=lambda: self.set_transparency(0.70))
+        menu.add_command(label="👻  60% 透明", command=lambda: self.set_transparency(0.60))
+        menu.add_command(label="💨  50% 透明", command=lambda: self.set_transparency(0.50))
+        menu.add_command(label="🫧  40% 透明", command=lambda: self.set_transparency(0.40))
+        menu.add_command(label="🌸  30% 透明", command=lambda: self.set_transparency(0.30))
+
+    def build_window_menu(self, menu):
+        menu.add_command(label="🖥️ 全屏/退出全屏 (F11)", command=self.toggle_fullscreen)
+        menu.add_command(label="📐 恢复默认大小", command=self.restore_size)
+
+    def build_perf_menu(self, menu):
+        menu.add_checkbutton(label="⏱️ 记录性能数据", variable=self.trace_var, command=self.toggle_trace)
+        menu.add_command(label="📈 性能面板", command=self.show_perf_overlay)
+        menu.add_command(label="💾 导出性能记录", command=self.export_trace)
+        menu.add_command(label="🚀 启动耗时", command=self.show_startup_report)
+
+    def build_top_menu(self, menu):
+        topmost = self.root.attributes("-topmost")
+        menu.add_command(label="🔒 取消置顶" if topmost else "🔓 恢复置顶", command=self.toggle_topmost)
 
     def set_transparency(self, value):
         self.transparency = value
         self.root.attributes('-alpha', value)
         messagebox.showinfo("透明度设置", f"透明度已调整为：{int(value * 100)}%")
 
+    def toggle_trace(self):
+        if self.trace_var.get():
+            TRACER.enable(self.root)
+        else:
+            TRACER.disable()
+
+    def show_perf_overlay(self):
+        """打开性能面板（同时开启记录）"""
+        if self.perf_overlay and self.perf_overlay.winfo_exists():
+            self.perf_overlay.lift()
+            return
+        self.trace_var.set(True)
+        self.toggle_trace()
+        self.perf_overlay = PerfOverlay(self.root)
+
+    def export_trace(self):
+        path = filedialog.asksaveasfilename(defaultextension=".jsonl", title="💾 导出性能记录",
+                                            filetypes=[("JSON Lines", "*.jsonl")])
+        if not path:
+            return
+        try:
+            count = TRACER.export_jsonl(path)
+            messagebox.showinfo("✅ 导出成功", f"已导出 {count} 条记录：\n{path}")
+        except Exception as e:
+            messagebox.showerror("❌ 导出失败", f"导出失败：\n{str(e)}")
+
+    def show_startup_report(self):
+        messagebox.showinfo("🚀 启动耗时", self.startup.format())
+
     def show_transparency_panel(self):
         panel = tk.Toplevel(self.root)
         panel.title("🎚️ 透明度调节")
@@ -138,8 +562,8 @@ class TopNotepad:
         slider = tk.Scale(slider_frame, from_=0.3, to=1.0, resolution=0.05,
                           orient=tk.HORIZONTAL, font=self.small_font,
                           bg="#fafafa", highlightthickness=0,
-                          command=lambda v: (self.root.attributes('-alpha', float(v)),
-                                             label.config(text=f"{int(float(v) * 100)}%")),
+                          command=lambda v: self.scheduler.invalidate(
+                              "alpha", lambda: self.preview_transparency(float(v), label), PRIORITY_VISUAL),
                           length=200)
         slider.set(self.transparency)
         slider.pack(pady=10)
@@ -158,6 +582,12 @@ class TopNotepad:
                   command=lambda: (self.root.attributes('-alpha', 1.0), panel.destroy()),
                   font=self.small_font, bg="#fff3e0", fg="#ef6c00").pack(side=tk.LEFT, padx=10)
 
+    def preview_transparency(self, value, label):
+        """拖动滑块时每帧只设置一次透明度"""
+        if label.winfo_exists():
+            self.root.attributes('-alpha', value)
+            label.config(text=f"{int(value * 100)}%")
+
     def toggle_fullscreen(self):
         current = self.root.attributes('-fullscreen')
         self.root.attributes('-fullscreen', not current)
@@ -169,52 +599,163 @@ class TopNotepad:
         self.root.geometry("500x620")
         self.root.attributes('-topmost', True)
 
+    @traced("switch_mode", lambda self, mode: {"mode": mode, "widgets": count_widgets(self.root)})
     def switch_mode(self, mode):
+        """隐藏当前模式界面、显示目标模式界面；控件保留，撤销历史和滚动位置不丢失"""
         if mode == self.mode:
             return
-        if self.mode == "note" and self.text:
-            self.note_content = self.text.get("1.0", tk.END).strip()
-        elif self.mode == "memo":
-            self.memo_data = self.collect_tasks()
-            self.save_memo_data()
+        if self.mode == "note":
+            self.autosave_note()  # 未修改时不会写盘
 
-        # 清空所有子控件
-        for widget in self.root.winfo_children():
-            if not isinstance(widget, tk.Menu):
-                widget.destroy()
+        current = self.mode_frames.get(self.mode)
+        if current is not None:
+            current.pack_forget()
 
+        if mode == "memo":
+            self.ensure_memo()
         self.mode = mode
-        if mode == "note":
-            self.create_note_mode()
-        else:
-            self.create_memo_mode()
+        frame = self.mode_frames.get(mode)
+        if frame is None:
+            frame = tk.Frame(self.root)
+            self.mode_frames[mode] = frame
+            if mode == "note":
+                self.create_note_mode(frame)
+            else:
+                self.create_memo_mode(frame)
+        frame.pack(fill=tk.BOTH, expand=True)
 
-    def create_note_mode(self):
-        title_frame = tk.Frame(self.root, bg="#e8f4fd", relief="ridge", bd=1)
+    def create_note_mode(self, parent):
+        title_frame = tk.Frame(parent, bg="#e8f4fd", relief="ridge", bd=1)
         title_frame.pack(fill=tk.X, pady=(5, 0))
         tk.Label(title_frame, text="📝 记事本模式", font=("Microsoft YaHei", 14, "bold"),
                  bg="#e8f4fd", fg="#2196f3", pady=8).pack()
 
-        frame = tk.Frame(self.root, padx=10, pady=10)
-        frame.pack(fill=tk.BOTH, expand=True)
+        self.note_frame = tk.Frame(parent, padx=10, pady=10)
+        self.note_frame.pack(fill=tk.BOTH, expand=True)
+
+        if self.large_doc:
+            from large_file import LargeFileView
+            self.text = None
+            self.large_view = LargeFileView(self.note_frame, self.large_doc, font=self.default_font,
+                                            scheduler=self.scheduler)
+            self.large_view.pack(fill=tk.BOTH, expand=True)
+        else:
+            self.create_note_text()
 
-        self.text = tk.Text(frame, wrap=tk.WORD, font=self.default_font,
+    def create_note_text(self):
+        self.large_view = None
+        self.text = tk.Text(self.note_frame, wrap=tk.WORD, font=self.default_font,
                             bg="#fafcff", relief="flat", padx=10, pady=10,
-                            insertbackground="#2196f3", selectbackground="#bbdefb")
+                            insertbackground="#2196f3", selectbackground="#bbdefb", undo=True)
         self.text.pack(fill=tk.BOTH, expand=True)
 
         if self.note_content:
             self.text.insert(tk.END, self.note_content)
+        self.text.edit_reset()
+        self.text.edit_modified(False)
+        self.text.bind("<<Modified>>", self.on_note_modified)
+
+    def on_note_modified(self, event=None):
+        """Text 的修改标志置位后安排一次自动保存（连续输入只保存一次）"""
+        if self.text and self.text.edit_modified() and self._autosave_after_id is None:
+            self._autosave_after_id = self.root.after(AUTOSAVE_DELAY_MS, self.autosave_note)
+
+    def autosave_note(self):
+        """取出当前文本交给后台线程：计算增量、压缩、写盘都不在界面线程"""
+        if self._autosave_after_id is not None:
+            self.root.after_cancel(self._autosave_after_id)
+            self._autosave_after_id = None
+        if not self.text or not self.text.edit_modified():
+            return
+        content = self.text.get("1.0", "end-1c")
+        self.text.edit_modified(False)
+        self.persist.submit(lambda: self.note_history.save(content), key="note")
+
+    def show_note_history(self):
+        """历史版本面板：选择一个版本恢复到记事本"""
+        self.autosave_note()
+        self.persist.flush(timeout=5)
+        versions = self.note_history.versions()
+        if not versions[0]:
+            messagebox.showinfo("🕘 历史版本", "还没有自动保存的版本")
+            return
+
+        panel = tk.Toplevel(self.root)
+        panel.title("🕘 历史版本")
+        panel.geometry("320x360")
+        panel.transient(self.root)
+        panel.attributes('-topmost', True)
+
+        listbox = tk.Listbox(panel, font=self.small_font, activestyle="none")
+        listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        for i, ts in enumerate(versions):
+            label = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+            listbox.insert(tk.END, f"{label}{'（当前）' if i == 0 else ''}")
 
-    def create_memo_mode(self):
+        def restore():
+            selection = listbox.curselection()
+            if not selection:
+                return
+            content = self.note_history.restore(selection[0])
+            panel.destroy()
+            self.switch_mode("note")
+            self.close_large_file()
+            if self.text:
+                self.text.delete("1.0", tk.END)
+                self.text.insert(tk.END, content)
+
+        tk.Button(panel, text="♻️ 恢复所选版本", command=restore,
+                  font=self.small_font, bg="#c8e6c9", fg="#2e7d32").pack(pady=(0, 10))
+
+    def open_large_file(self, path):
+        """大文件：内存映射+后台行索引，只物化视口附近的行"""
+        from large_file import LargeFileView, LargeTextFile
+        self.close_large_file()
+        self.large_doc = LargeTextFile(path)
+        self.switch_mode("note")
+        if self.text:
+            self.autosave_note()
+            self.note_content = self.text.get("1.0", tk.END).strip()
+            self.text.destroy()
+            self.text = None
+        if not self.large_view:
+            self.large_view = LargeFileView(self.note_frame, self.large_doc, font=self.default_font,
+                                            scheduler=self.scheduler)
+            self.large_view.pack(fill=tk.BOTH, expand=True)
+        self.filename = path
+
+    def close_large_file(self):
+        """关闭只读大文件，恢复可编辑的记事本"""
+        if not self.large_doc:
+            return
+        if self.large_view:
+            self.large_view.destroy()
+            self.create_note_text()
+        self.large_doc.close()
+        self.large_doc = None
+
+    def goto_line(self):
+        if self.mode != "note":
+            return
+        number = simpledialog.askinteger("跳转到行", "行号：", parent=self.root, minvalue=1)
+        if not number:
+            return
+        if self.large_view:
+            self.large_view.goto_line(number)
+        elif self.text:
+            self.text.see(f"{number}.0")
+            self.text.mark_set(tk.INSERT, f"{number}.0")
+
+    def create_memo_mode(self, parent):
         """✅ 完美布局：任务列表 → 按钮 → 提示"""
-        title_frame = tk.Frame(self.root, bg="#e8f5e8", relief="ridge", bd=1)
+        from memo_view import VirtualTaskList
+        title_frame = tk.Frame(parent, bg="#e8f5e8", relief="ridge", bd=1)
         title_frame.pack(fill=tk.X, pady=(5, 0))
         tk.Label(title_frame, text="✅ 横线备忘录模式", font=("Microsoft YaHei", 14, "bold"),
                  bg="#e8f5e8", fg="#4caf50", pady=8).pack()
 
         # 主容器
-        main_container = tk.Frame(self.root, padx=10, pady=10)
+        main_container = tk.Frame(parent, padx=10, pady=10)
         main_container.pack(fill=tk.BOTH, expand=True)
 
         # 1. 输入区域
@@ -234,13 +775,48 @@ class TopNotepad:
                             relief="raised", bd=2, padx=15, pady=6)
         add_btn.pack(side=tk.RIGHT, padx=10, pady=8)
 
-        # 2. 任务列表容器
+        # 搜索/筛选区域（输入即过滤）
+        search_frame = tk.Frame(main_container, relief="groove", bd=1, bg="#e3f2fd")
+        search_frame.pack(fill=tk.X, pady=(0, 10))
+
+        tk.Label(search_frame, text="🔍 搜索:", font=self.small_font,
+                 bg="#e3f2fd", fg="#1976d2").pack(side=tk.LEFT, padx=10, pady=6)
+
+        self.filter_keys = None
+        self.search_var = tk.StringVar()
+        self.filter_var = tk.StringVar(value="all")
+        tk.Entry(search_frame, textvariable=self.search_var, font=self.small_font,
+                 relief="solid", bd=1, bg="#ffffff").pack(side=tk.LEFT, fill=tk.X, expand=True, pady=6)
+        for value, label in (("done", "已完成"), ("todo", "未完成"), ("all", "全部")):
+            tk.Radiobutton(search_frame, text=label, value=value, variable=self.filter_var,
+                           indicatoron=0, font=self.small_font, bg="#e3f2fd",
+                           selectcolor="#bbdefb", padx=6).pack(side=tk.RIGHT, padx=(0, 6), pady=6)
+        self.search_var.trace_add("write", lambda *args: self.schedule_filter())
+        self.filter_var.trace_add("write", lambda *args: self.schedule_filter())
+
+        # 2. 任务列表容器（虚拟化列表，只创建可见行）
         tasks_container = tk.Frame(main_container)
         tasks_container.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
 
-        self.task_frame = tk.Frame(tasks_container, relief="sunken", bd=1, bg="#f8f9fa")
+        self.task_frame = VirtualTaskList(
+            tasks_container,
+            count=self.visible_count,
+            get_task=self.visible_task,
+            key=self.visible_key,
+            on_toggle=self.toggle_task,
+            on_context=self.confirm_delete,
+            font=self.default_font,
+            scheduler=self.scheduler,
+            relief="sunken", bd=1, bg="#f8f9fa"
+        )
         self.task_frame.pack(fill=tk.BOTH, expand=True)
 
+        stats_frame = tk.Frame(tasks_container, bg="#f8f9fa")
+        stats_frame.pack(fill=tk.X, pady=(5, 0))
+        self.stats_label = tk.Label(stats_frame, font=("Microsoft YaHei", 9),
+                                    fg="#757575", bg="#f8f9fa")
+        self.stats_label.pack()
+
         # 3. 控制按钮（右下角）
         buttons_frame = tk.Frame(main_container)
         buttons_frame.pack(fill=tk.X, pady=(0, 5))
@@ -263,94 +839,111 @@ class TopNotepad:
         hint_frame = tk.Frame(main_container, bg="#fff8e8", relief="groove", bd=1)
         hint_frame.pack(fill=tk.X, pady=(0, 0))
         hint = tk.Label(hint_frame,
-                        text="💡 右键任务可单独删除 | 完成任务自动变灰 | 最多500条 | F11全屏 | 透明度菜单调节",
+                        text="💡 右键任务可单独删除 | 完成任务自动变灰 | 滚轮浏览 | F11全屏 | 透明度菜单调节",
                         font=("Microsoft YaHei", 9), fg="#f57c00", bg="#fff8e8")
         hint.pack(pady=8)
 
         # 渲染任务
         self.render_tasks()
 
+    @traced("render_tasks", lambda self: {"rows": len(self.task_frame.rows) if self.task_frame else 0})
     def render_tasks(self):
-        """✅ 修复：正确清空+统计"""
+        """✅ 整体刷新：数据被整体替换后使用"""
         if not self.task_frame:
             return
 
-        # 清空任务列表
-        for widget in self.task_frame.winfo_children():
-            widget.destroy()
-
-        # 渲染任务项
-        for i, task in enumerate(self.memo_data):
-            task_item = tk.Frame(self.task_frame, relief="ridge", bd=1)
-            task_item.pack(fill=tk.X, padx=5, pady=2)
-
-            var_done = tk.BooleanVar(value=task["done"])
-            cb_done = tk.Checkbutton(
-                task_item,
-                text=f"  {task['text']}",
-                variable=var_done,
-                font=self.default_font,
-                anchor='w',
-                justify='left',
-                padx=15,
-                pady=8,
-                command=lambda idx=i, v=var_done: self.toggle_task(idx, v),
-                bg="#e8f5e8" if not task["done"] else "#f5f5f5",
-                selectcolor="#c8e6c9" if not task["done"] else "#e0e0e0"
-            )
-            cb_done.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.task_frame.select_mode = self.select_mode
+        self.task_frame.reset()
+        self.update_stats()
 
-            if task["done"]:
-                cb_done.config(fg="#9e9e9e", relief="sunken")
+    def visible_count(self):
+        return self.memo.count() if self.filter_keys is None else len(self.filter_keys)
 
-            cb_done.bind("<Button-3>", lambda e, idx=i: self.confirm_delete(idx))
+    def visible_task(self, index):
+        if self.filter_keys is None:
+            return self.memo.get(index)
+        return self.memo.get_by_key(self.filter_keys[index])
 
-            if self.select_mode:
-                var_sel = tk.BooleanVar(value=False)
-                sel_container = tk.Frame(task_item)
-                sel_container.pack(side=tk.RIGHT, padx=5, pady=5)
-                sel_box = tk.Checkbutton(sel_container, variable=var_sel, bg="white",
-                                         selectcolor="#fff3e0")
-                sel_box.pack()
-                task["selected"] = var_sel
-            else:
-                task.pop("selected", None)
+    def visible_key(self, index):
+        return self.memo.key(index) if self.filter_keys is None else self.filter_keys[index]
+
+    def apply_filter(self):
+        """按搜索框和完成状态过滤任务，结果直接作为列表的数据源"""
+        if not self.search_var:
+            return
+        query = self.search_var.get().strip()
+        status = self.filter_var.get()
+        if not query and status == "all":
+            if self.filter_keys is not None:
+                self.filter_keys = None
+                self.render_tasks()
+            return
 
-        # ✅ 添加统计信息
-        stats_frame = tk.Frame(self.task_frame, bg="#f8f9fa")
-        stats_frame.pack(fill=tk.X, padx=5, pady=5)
+        if not self.search.poll():
+            if not self.search.building:
+                self.search.start(list(self.memo.iter_entries()))
+            self.show_stats_text("⏳ 正在建立搜索索引…")
+            if self._filter_after_id is None:
+                self._filter_after_id = self.root.after(50, self._retry_filter)
+            return
+        self.filter_keys = self.search.search(query, None if status == "all" else status)
+        self.render_tasks()
 
-        stats_text = f"📊 总计: {len(self.memo_data)} 条 | "
-        done_count = sum(1 for t in self.memo_data if t["done"])
-        stats_text += f"已完成: {done_count} 条"
+    def schedule_filter(self):
+        """输入搜索词、切换筛选或连续修改时，每帧只重新筛选一次"""
+        self.scheduler.invalidate("filter", self.apply_filter, PRIORITY_LAYOUT)
 
-        self.stats_label = tk.Label(stats_frame, text=stats_text,
-                                    font=("Microsoft YaHei", 9), fg="#757575", bg="#f8f9fa")
-        self.stats_label.pack()
+    def _retry_filter(self):
+        self._filter_after_id = None
+        self.apply_filter()
+
+    def reload_tasks(self):
+        """任务被整体替换（导入/清空）后：丢弃搜索索引并整体刷新"""
+        self.search.invalidate()
+        if not self.task_frame:
+            return
+        if self.filter_keys is not None:
+            # 旧的筛选结果可能含有已不存在的任务，先显示全部，索引建好后再筛选
+            self.filter_keys = None
+            self.schedule_filter()
+        self.render_tasks()
+
+    def update_stats(self):
+        """统计信息按帧合并刷新"""
+        self.scheduler.invalidate("stats", self._render_stats, PRIORITY_STATS)
+
+    def show_stats_text(self, text):
+        self.scheduler.invalidate("stats", lambda: self.stats_label.config(text=text), PRIORITY_STATS)
+
+    def _render_stats(self):
+        """✅ 统计信息（计数由存储层增量维护，无需遍历任务）"""
+        if not self.stats_label:
+            return
+        stats_text = "" if self.filter_keys is None else f"🔍 匹配: {len(self.filter_keys)} 条 | "
+        stats_text += f"📊 总计: {self.memo.count()} 条 | "
+        stats_text += f"已完成: {self.memo.done_count()} 条"
+        self.stats_label.config(text=stats_text)
 
     def add_task(self):
         task_text = self.entry.get().strip()
         if not task_text:
             return
-        if len(self.memo_data) >= 500:
-            messagebox.showwarning("超出限制", "任务已达 500 条上限！\n请先清理旧任务 🗑️")
-            return
-        self.memo_data.insert(0, {"text": task_text, "done": False})
         self.entry.delete(0, tk.END)
-        self.render_tasks()
-        self.save_memo_data()
+        self.memo.add(task_text)
+        if self.filter_keys is None:
+            self.task_frame.see(0)  # 新任务在最前；滚动到下方时插入不会移动视图，需滚回顶部才看得到
 
-    def toggle_task(self, index, var):
-        self.memo_data[index]["done"] = var.get()
-        self.render_tasks()
-        self.save_memo_data()
+    def toggle_task(self, index, done):
+        key = self.visible_key(index)
+        memo_index = index if self.filter_keys is None else self.memo.index_of(key)
+        self.memo.set_done(memo_index, done)
 
     def confirm_delete(self, index):
-        task_text = self.memo_data[index]["text"]
-        if messagebox.askyesno("🗑️ 确认删除", f"确定删除任务吗？\n\n『{task_text}』"):
-            self.memo_data.pop(index)
-            self.render_tasks()
-            self.save_memo_data()
+        # 对话框期间定时器照常运行（同步、筛选），下标可能指向别的任务，先记下键值
+        key = self.visible_key(index)
+        task_text = self.memo.get_by_key(key)["text"]
+        if messagebox.askyesno("🗑️ 确认删除", f"确定删除任务吗？\n\n『{task_text}』") and self.memo.has(key):
+            self.remove_tasks([key])
 
     def toggle_select_mode(self):
         self.select_mode = not self.select_mode
@@ -360,33 +953,32 @@ class TopNotepad:
         else:
             self.select_btn.config(text="选择", bg="#fff3e0")
             self.del_selected_btn.config(state=tk.DISABLED)
-        self.render_tasks()
+        self.task_frame.set_select_mode(self.select_mode)
 
     def delete_selected(self):
-        to_delete = [i for i, t in enumerate(self.memo_data)
-                     if t.get("selected") and t["selected"].get()]
-        if not to_delete:
+        selected = [key for key in self.task_frame.selected_keys() if self.memo.has(key)]
+        if not selected:
             messagebox.showinfo("提示", "⚠️ 未选择任何任务！")
             return
-        if messagebox.askyesno("🗑️ 确认删除", f"确定删除 {len(to_delete)} 个选中的任务？"):
-            for i in reversed(to_delete):
-                del self.memo_data[i]
-            self.render_tasks()
-            self.save_memo_data()
+        if messagebox.askyesno("🗑️ 确认删除", f"确定删除 {len(selected)} 个选中的任务？"):
+            self.remove_tasks(selected)
+
+    def remove_tasks(self, keys):
+        """批量删除任务：存储层一次完成，列表和索引由修改通知更新"""
+        self.memo.delete_many(keys)
 
     def collect_tasks(self):
-        return [{"text": t["text"], "done": t["done"]} for t in self.memo_data]
+        return self.memo.export()
 
     def new_file(self):
         if messagebox.askyesno("🆕 新建文件", "是否清空当前内容？"):
             if self.mode == "note":
+                self.close_large_file()
                 if self.text:
                     self.text.delete("1.0", tk.END)
                 self.note_content = ""
             else:
-                self.memo_data = []
-                self.render_tasks()
-                self.save_memo_data()
+                self.memo.replace([])
             self.filename = None
 
     def open_file(self):
@@ -394,46 +986,99 @@ class TopNotepad:
         path = filedialog.askopenfilename(filetypes=filetypes, title="📂 打开文件")
         if not path:
             return
+        from memo_import import sniff_format
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                content = f.read()
+            # 只读取文件开头判断格式，纯文本文件不做整体 JSON 解析
+            if sniff_format(path) == "memo" and messagebox.askyesno(
+                    "导入备忘录", "检测到备忘录格式内容，是否导入为备忘录？"):
+                if messagebox.askyesno("添加方式", "是否在原内容基础上增加？"):
+                    self.import_memo_file(path, replace=False)
+                    return
+                if messagebox.askyesno("删除原有", "是否删除原有所有任务？"):
+                    self.import_memo_file(path, replace=True)
+                    return
+            self.open_text_file(path)
+            messagebox.showinfo("✅ 打开成功", f"文件已加载：\n{os.path.basename(path)}")
+        except Exception as e:
+            messagebox.showerror("❌ 打开失败", f"无法打开文件：\n{str(e)}")
 
+    @traced("open_file", lambda self, path: {"bytes": os.path.getsize(path)})
+    def open_text_file(self, path):
+        """在记事本模式中打开文本文件（大文件走只读分页视图）"""
+        from large_file import LARGE_FILE_BYTES
+        if os.path.getsize(path) > LARGE_FILE_BYTES:
+            self.open_large_file(path)
+            return
+        self.close_large_file()
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+        self.switch_mode("note")
+        if self.text:
+            self.text.delete("1.0", tk.END)
+            self.text.insert(tk.END, content)
+            self.text.edit_reset()  # 打开新文件后不能撤销回上一个文件
+        self.filename = path
+
+    def import_memo_file(self, path, replace):
+        """流式导入备忘录：后台线程逐项解析校验，界面线程分批就地合并"""
+        from memo_import import MemoImporter
+        self.switch_mode("memo")
+        self.search_var.set("")
+        self.filter_var.set("all")
+        self.search.invalidate()
+        self.memo.begin_import()
+        importer = MemoImporter(path)
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("📥 导入备忘录")
+        dialog.geometry("300x120")
+        dialog.transient(self.root)
+        dialog.grab_set()  # 导入期间禁止修改任务，窗口仍可正常重绘
+        label = tk.Label(dialog, text="正在导入…", font=self.default_font)
+        label.pack(pady=15)
+        tk.Button(dialog, text="取消", font=self.small_font, bg="#ffcdd2", fg="#c62828",
+                  command=lambda: self.finish_import(importer, dialog, path, replace, cancelled=True)
+                  ).pack()
+        dialog.protocol("WM_DELETE_WINDOW",
+                        lambda: self.finish_import(importer, dialog, path, replace, cancelled=True))
+        self.poll_import(importer, dialog, label, path, replace)
+
+    def poll_import(self, importer, dialog, label, path, replace):
+        if not dialog.winfo_exists():
+            return
+        # 每次最多占用约一帧的时间合并数据，其余时间留给事件循环
+        deadline = time.monotonic() + 0.015
+        while time.monotonic() < deadline:
             try:
-                data = json.loads(content)
-                if isinstance(data, list) and all(
-                        isinstance(item, dict) and "text" in item and "done" in item for item in data):
-                    if messagebox.askyesno("导入备忘录", "检测到备忘录格式内容，是否导入为备忘录？"):
-                        if messagebox.askyesno("添加方式", "是否在原内容基础上增加？"):
-                            self.memo_data = data + self.memo_data
-                        else:
-                            if messagebox.askyesno("删除原有", "是否删除原有所有任务？"):
-                                self.memo_data = data
-                            else:
-                                self.switch_mode("note")
-                                if self.text:
-                                    self.text.delete("1.0", tk.END)
-                                    self.text.insert(tk.END, content)
-                                return
-                        self.switch_mode("memo")
-                        self.save_memo_data()
-                    else:
-                        self.switch_mode("note")
-                        if self.text:
-                            self.text.delete("1.0", tk.END)
-                            self.text.insert(tk.END, content)
-                        return
-                else:
-                    raise ValueError("Not memo format")
-            except (ValueError, json.JSONDecodeError):
-                self.switch_mode("note")
-                if self.text:
-                    self.text.delete("1.0", tk.END)
-                    self.text.insert(tk.END, content)
-
+                batch = importer.batches.get_nowait()
+            except queue.Empty:
+                break
+            if batch is None or isinstance(batch, Exception):
+                self.finish_import(importer, dialog, path, replace, error=batch)
+                return
+            self.memo.import_batch(batch)
+        label.config(text=f"正在导入… {importer.count} 条（{importer.progress():.0%}）")
+        self.root.after(15, lambda: self.poll_import(importer, dialog, label, path, replace))
+
+    def finish_import(self, importer, dialog, path, replace, error=None, cancelled=False):
+        from memo_import import MemoFormatError
+        importer.cancel()
+        dialog.destroy()
+        if cancelled or error is not None:
+            self.memo.abort_import()
+        else:
+            self.memo.end_import(replace)
+        if cancelled:
+            return
+        if isinstance(error, MemoFormatError):
+            # 与原逻辑一致：不是合法的备忘录列表时按普通文本打开
+            self.open_text_file(path)
+            messagebox.showinfo("✅ 打开成功", f"文件已按文本加载：\n{os.path.basename(path)}")
+        elif error is not None:
+            messagebox.showerror("❌ 打开失败", f"无法打开文件：\n{str(error)}")
+        else:
             self.filename = path
             messagebox.showinfo("✅ 打开成功", f"文件已加载：\n{os.path.basename(path)}")
-        except Exception as e:
-            messagebox.showerror("❌ 打开失败", f"无法打开文件：\n{str(e)}")
 
     def save_file(self):
         if not self.filename:
@@ -445,16 +1090,20 @@ class TopNotepad:
             )
             if not self.filename:
                 return
+        if self.mode == "note" and self.large_doc:
+            messagebox.showinfo("提示", "大文件以只读方式打开，无需保存")
+            return
         try:
-            if self.mode == "note":
-                if self.text:
-                    content = self.text.get("1.0", tk.END)
-                    with open(self.filename, "w", encoding="utf-8") as f:
-                        f.write(content)
-            else:
-                data = self.collect_tasks()
-                with open(self.filename, "w", encoding="utf-8") as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
+            with TRACER.span("save_file") as span:
+                if self.mode == "note":
+                    if self.text:
+                        content = self.text.get("1.0", tk.END)
+                        with open(self.filename, "w", encoding="utf-8") as f:
+                            f.write(content)
+                else:
+                    dump_tasks_json(self.filename, self.memo.iter_tasks())
+                if span:
+                    span.set(bytes=os.path.getsize(self.filename))
             messagebox.showinfo("✅ 保存成功", f"文件已保存到：\n{self.filename}")
         except Exception as e:
             messagebox.showerror("❌ 保存失败", f"保存失败：\n{str(e)}")
@@ -463,35 +1112,45 @@ class TopNotepad:
         current = self.root.attributes("-topmost")
         self.root.attributes("-topmost", not current)
         label = "🔓 恢复置顶" if not current else "🔒 取消置顶"
-        self.top_menu.entryconfig(0, label=label)
+        if self.top_menu.index(tk.END) is not None:  # 菜单还没展开过时，创建时会读取当前状态
+            self.top_menu.entryconfig(0, label=label)
 
 
 # 终极图标加载
 def setup_icon(root):
-    import sys, os
-    def try_load_icon(icon_path):
-        try:
-            root.iconbitmap(icon_path)
-            print(f"✓ 图标加载成功: {icon_path}")
-            return True
-        except:
-            return False
-
-    if not getattr(sys, 'frozen', False):
-        for icon_name in ['notepad.ico']:
-            if os.path.exists(icon_name) and try_load_icon(icon_name):
-                return
+    """设置窗口图标：源码运行取当前目录，打包版取解包目录；只尝试一个确定的路径"""
+    if getattr(sys, 'frozen', False):
+        icon_path = os.path.join(getattr(sys, '_MEIPASS', os.path.dirname(sys.executable)), 'notepad.ico')
     else:
-        temp_dir = sys._MEIPASS if hasattr(sys, '_MEIPASS') else os.path.dirname(sys.executable)
-        for icon_name in ['notepad.ico']:
-            icon_path = os.path.join(temp_dir, icon_name)
-            if try_load_icon(icon_path):
-                return
+        icon_path = 'notepad.ico'
+    if not os.path.exists(icon_path):
+        return
+    try:
+        root.iconbitmap(icon_path)
+    except tk.TclError:
+        pass
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="记事本便签")
+    parser.add_argument("--store", choices=["json", "journal", "sqlite", "binary"], default="json",
+                        help="备忘录存储方式：json 整体保存 / journal 追加日志 / sqlite 数据库 / binary 二进制快照")
+    parser.add_argument("--trace", action="store_true", help="启动时开启性能记录（菜单“性能”中可随时开关）")
+    parser.add_argument("--startup-report", nargs="?", const="-", metavar="PATH",
+                        help="备忘录加载完成后输出启动各阶段耗时（JSON，默认输出到标准输出）")
+    parser.add_argument("--sync-server", metavar="URL",
+                        help="与增量同步服务器交换备忘录修改，例如 http://127.0.0.1:8765（见 sync_server.py）")
+    args = parser.parse_args()
+
+    startup = StartupTimer(_START)
+    startup.mark("import")
     root = tk.Tk()
+    startup.mark("tk_init")
     setup_icon(root)
-    app = TopNotepad(root)
+    startup.mark("icon")
+    app = TopNotepad(root, store=args.store, trace=args.trace, startup=startup, sync_url=args.sync_server)
+    app.report_path = args.startup_report
     root.bind('<F11>', lambda e: app.toggle_fullscreen())
     root.mainloop()
\ No newline at end of file
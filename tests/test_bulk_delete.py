@@ -0,0 +1,54 @@
+"""批量删除：存储层一次删除，可见行和选择按稳定的任务 id 更新"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
+
+from memo_model import MemoStore  # noqa: E402
+from memo_view import VirtualTaskList  # noqa: E402
+
+
+class FakeTaskList:
+    """只带偏移和选择状态的 VirtualTaskList，不创建控件"""
+
+    rows_removed = VirtualTaskList.rows_removed
+    selected_keys = VirtualTaskList.selected_keys
+
+    def __init__(self):
+        self.offset = 0
+        self.row_height = 46
+        self.selected = set()
+        self.refreshed = 0
+
+    def refresh(self):
+        self.refreshed += 1
+
+
+class BulkDeleteTest(unittest.TestCase):
+    def test_selected_keys_removed_from_store_and_selection(self):
+        memo = MemoStore([{"text": f"t{i}", "done": i % 2 == 0} for i in range(10)])
+        view = FakeTaskList()
+        memo.subscribe(lambda kind, indices=None, keys=(), **info: view.rows_removed(set(indices), keys))
+        view.selected = {memo.key(1), memo.key(4), memo.key(8)}
+        kept = {memo.key(i) for i in range(10)} - view.selected
+
+        memo.delete_many(view.selected_keys())
+
+        self.assertEqual(memo.count(), 7)
+        self.assertEqual({memo.key(i) for i in range(memo.count())}, kept)
+        self.assertEqual(memo.done_count(), 3)
+        self.assertEqual(view.selected, set())
+        self.assertEqual(view.refreshed, 1)
+
+    def test_keys_are_not_reused_after_delete(self):
+        memo = MemoStore([{"text": "a", "done": False}])
+        old = memo.key(0)
+        memo.delete_many([old])
+        for i in range(100):
+            memo.add(f"n{i}")
+        self.assertNotIn(old, {memo.key(i) for i in range(memo.count())})
+
+
+if __name__ == "__main__":
+    unittest.main()
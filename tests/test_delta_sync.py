@@ -0,0 +1,62 @@
+"""增量同步客户端：后台线程遇到意外错误时输出并继续同步"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
+
+import delta_sync  # noqa: E402
+from delta_sync import DeltaSync  # noqa: E402
+
+
+class SyncThreadTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(delta_sync, "SYNC_DELAY", 0.01)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.sync = DeltaSync("http://127.0.0.1:9", os.path.join(self.dir.name, "delta_sync.json"))
+
+    def tearDown(self):
+        self.sync.close(5)
+        self.dir.cleanup()
+
+    def run_rounds(self, errors):
+        """依次让每一轮请求抛出 errors 中的异常，之后的一轮成功"""
+        calls = []
+        done = threading.Event()
+
+        def fake_round():
+            calls.append(len(calls))
+            if len(calls) <= len(errors):
+                raise errors[len(calls) - 1]
+            done.set()
+            return False
+
+        self.sync._round = fake_round
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.sync.start([])
+            self.assertTrue(done.wait(5))
+        return len(calls), stderr.getvalue()
+
+    def test_unexpected_error_logged_and_thread_keeps_running(self):
+        calls, output = self.run_rounds([RuntimeError("boom")])
+        self.assertEqual(calls, 2)
+        self.assertIn("RuntimeError: boom", output)
+        self.assertTrue(self.sync._thread.is_alive())
+
+    def test_network_error_retried_quietly(self):
+        calls, output = self.run_rounds([OSError("connection refused")])
+        self.assertEqual(calls, 2)
+        self.assertEqual(output, "")
+        self.assertTrue(self.sync._thread.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
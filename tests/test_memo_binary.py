@@ -0,0 +1,103 @@
+"""二进制快照：写入后读回一致，文本按需解码，损坏的文件被拒绝"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
+
+from memo_binary import (  # noqa: E402
+    BinarySnapshot, SnapshotError, json_to_snapshot, snapshot_to_json, write_snapshot,
+)
+from memo_model import MemoStore  # noqa: E402
+
+ROWS = [
+    (1, "买牛奶", False, 1.5, 0.0),
+    (2, "", True, 2.0, 3.0),
+    (3, "emoji 😀 和换行\n第二行", False, 4.0, 5.0),
+] + [(10 + i, f"任务{i}", i % 3 == 0, float(i), float(i)) for i in range(20)]
+
+
+class BinarySnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "memo_data.bin")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_round_trip(self):
+        write_snapshot(self.path, ROWS)
+        snapshot = BinarySnapshot(self.path)
+        self.assertEqual(snapshot.count, len(ROWS))
+        self.assertEqual([(d["id"], d["text"], d["done"], d["text_ts"], d["done_ts"])
+                          for d in snapshot.iter_dicts()], ROWS)
+
+    def test_lazy_tasks_decode_on_first_access(self):
+        write_snapshot(self.path, ROWS)
+        tasks = BinarySnapshot(self.path).tasks()
+        task = tasks[2]
+        self.assertEqual(task.raw_text(), ROWS[2][1].encode("utf-8"))
+        self.assertEqual(task.text, ROWS[2][1])
+        self.assertEqual((task.id, task.done, task.text_ts, task.done_ts), (3, False, 4.0, 5.0))
+
+        store = MemoStore.from_records(tasks)
+        self.assertEqual(store.count(), len(ROWS))
+        self.assertEqual(store.done_count(), sum(1 for row in ROWS if row[2]))
+        self.assertEqual(store.get(0)["text"], "买牛奶")
+
+    def test_resave_from_raw_bytes(self):
+        write_snapshot(self.path, ROWS)
+        store = MemoStore.from_records(BinarySnapshot(self.path).tasks())
+        store.add("新任务")
+        copy = os.path.join(self.dir.name, "copy.bin")
+        write_snapshot(copy, ((key, task.raw_text(), done, text_ts, done_ts)
+                              for key, task, done, text_ts, done_ts in store.snapshot_rows()))
+        texts = [d["text"] for d in BinarySnapshot(copy).iter_dicts()]
+        self.assertEqual(texts, ["新任务"] + [row[1] for row in ROWS])
+
+    def test_empty_snapshot(self):
+        write_snapshot(self.path, [])
+        snapshot = BinarySnapshot(self.path)
+        self.assertEqual(snapshot.count, 0)
+        self.assertEqual(snapshot.tasks(), [])
+
+    def _write_bytes(self, data):
+        with open(self.path, "wb") as f:
+            f.write(data)
+
+    def test_corrupt_files_rejected(self):
+        write_snapshot(self.path, ROWS)
+        with open(self.path, "rb") as f:
+            good = f.read()
+        flipped = bytearray(good)
+        flipped[-1] ^= 0xFF
+        cases = {
+            "empty": b"",
+            "truncated header": good[:10],
+            "truncated body": good[:-3],
+            "bad magic": b"NOPE" + good[4:],
+            "bad version": good[:4] + b"\x09\x00" + good[6:],
+            "flipped byte": bytes(flipped),
+        }
+        for name, data in cases.items():
+            with self.subTest(name):
+                self._write_bytes(data)
+                with self.assertRaises(SnapshotError):
+                    BinarySnapshot(self.path)
+
+    def test_json_conversion_round_trip(self):
+        json_path = os.path.join(self.dir.name, "memo_data.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump([{"text": "a", "done": True}, {"id": 7, "text": "b", "done": False}], f)
+        json_to_snapshot(json_path, self.path)
+        out = os.path.join(self.dir.name, "out.json")
+        snapshot_to_json(self.path, out)
+        with open(out, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), [{"text": "a", "done": True}, {"text": "b", "done": False}])
+        self.assertEqual(BinarySnapshot(self.path).ids[1], 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""备忘录命令行：条目校验与逐文件报错"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
+
+from memo_cli import iter_memo_file, main  # noqa: E402
+from memo_import import MemoFormatError  # noqa: E402
+
+
+class MemoCliTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.dir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def test_rejects_wrong_field_types(self):
+        cases = [
+            ("a.json", json.dumps([{"text": "ok", "done": False}, {"text": 123, "done": True}])),
+            ("b.json", json.dumps([{"text": "ok", "done": "yes"}])),
+            ("c.jsonl", '{"text": "a", "done": 1}\n'),
+        ]
+        for name, content in cases:
+            path = self.write(name, content)
+            with self.subTest(name), self.assertRaises(MemoFormatError):
+                list(iter_memo_file(path))
+
+    def test_invalid_file_reported_without_output(self):
+        good = self.write("good.json", json.dumps([{"text": "a", "done": True}]))
+        bad = self.write("bad.json", json.dumps([{"text": 123, "done": True}]))
+        out = os.path.join(self.dir.name, "out.bin")
+        self.assertEqual(main(["convert", bad, "-o", out, "-j", "1"]), 1)
+        self.assertFalse(os.path.exists(out))
+        merged = os.path.join(self.dir.name, "merged.json")
+        self.assertEqual(main(["merge", good, bad, "-o", merged, "-j", "1", "--skip-invalid"]), 1)
+        self.assertEqual(list(iter_memo_file(merged)), [{"text": "a", "done": True}])
+
+
+if __name__ == "__main__":
+    unittest.main()
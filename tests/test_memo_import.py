@@ -0,0 +1,74 @@
+"""流式 JSON 数组解析与备忘录条目校验"""
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
+
+from memo_import import MemoFormatError, MemoImporter, is_memo_item, iter_json_array  # noqa: E402
+
+
+class IterJsonArrayTest(unittest.TestCase):
+    def parse(self, text, chunk_bytes):
+        return list(iter_json_array(io.StringIO(text), chunk_bytes))
+
+    def test_trailing_whitespace_allowed(self):
+        for chunk_bytes in (1, 3, 4096):
+            with self.subTest(chunk_bytes=chunk_bytes):
+                self.assertEqual(self.parse("[] \n", chunk_bytes), [])
+                self.assertEqual(self.parse(' [ {"a": 1}, 2 ]\n\n', chunk_bytes), [{"a": 1}, 2])
+
+    def test_trailing_content_rejected(self):
+        for text in ("[]x", "[1, 2]]", "[1] [2]"):
+            for chunk_bytes in (1, 3, 4096):
+                with self.subTest(text=text, chunk_bytes=chunk_bytes), self.assertRaises(MemoFormatError):
+                    self.parse(text, chunk_bytes)
+
+
+BAD_ITEMS = {
+    "not an object": "x",
+    "missing done": {"text": "a"},
+    "text not str": {"text": 1, "done": False},
+    "text null": {"text": None, "done": False},
+    "done not bool": {"text": "a", "done": 0},
+    "done string": {"text": "a", "done": "false"},
+}
+
+
+class MemoItemTest(unittest.TestCase):
+    def test_is_memo_item(self):
+        self.assertTrue(is_memo_item({"text": "a", "done": True, "id": 3}))
+        for name, item in BAD_ITEMS.items():
+            with self.subTest(name):
+                self.assertFalse(is_memo_item(item))
+
+    def run_importer(self, items):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "memo.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(items, f)
+            importer = MemoImporter(path, batch_size=2)
+            received = []
+            while True:
+                batch = importer.batches.get(timeout=5)
+                if batch is None or isinstance(batch, Exception):
+                    return received, batch
+                received.extend(batch)
+
+    def test_importer_rejects_bad_items(self):
+        for name, item in BAD_ITEMS.items():
+            with self.subTest(name):
+                _, end = self.run_importer([{"text": "ok", "done": False}, item])
+                self.assertIsInstance(end, MemoFormatError)
+
+    def test_importer_keeps_text_and_done(self):
+        received, end = self.run_importer([{"text": "a", "done": True, "id": 5}, {"text": "b", "done": False}])
+        self.assertIsNone(end)
+        self.assertEqual(received, [{"text": "a", "done": True}, {"text": "b", "done": False}])
+
+
+if __name__ == "__main__":
+    unittest.main()
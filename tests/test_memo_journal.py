@@ -0,0 +1,110 @@
+"""追加日志：批量回放与逐条回放结果一致，写了一半的末尾记录被截掉"""
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
+
+from memo_journal import MemoJournal  # noqa: E402
+
+
+def naive_replay(data, records):
+    """逐条回放的参考实现：每条新增插到最前，每次删除重建列表"""
+    for record in records:
+        by_id = {t["id"]: t for t in data}
+        if record["op"] == "add":
+            if record["id"] not in by_id:
+                data.insert(0, {key: record[key] for key in ("id", "text", "done", "text_ts", "done_ts")})
+        elif record["op"] == "set":
+            task = by_id.get(record["id"])
+            if task is not None and record["ts"] >= task["done_ts"]:
+                task["done"] = record["done"]
+                task["done_ts"] = record["ts"]
+        else:
+            data[:] = [t for t in data if t["id"] not in set(record["ids"])]
+    return data
+
+
+def add(key, ts=1.0):
+    return {"op": "add", "id": key, "text": f"t{key}", "done": False, "text_ts": ts, "done_ts": ts}
+
+
+SNAPSHOT = [{"id": i, "text": f"s{i}", "done": False, "text_ts": 0, "done_ts": 0} for i in range(1, 6)]
+
+
+class MemoJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "memo_data.json")
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(SNAPSHOT, f)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_replay_matches_record_by_record(self):
+        rng = random.Random(3)
+        records = []
+        ids = [t["id"] for t in SNAPSHOT]
+        next_id = 100
+        for step in range(400):
+            roll = rng.random()
+            if roll < 0.4:
+                records.append(add(next_id, step))
+                ids.append(next_id)
+                next_id += 1
+            elif roll < 0.7:
+                records.append({"op": "set", "id": rng.choice(ids), "done": rng.random() < 0.5,
+                                "ts": rng.choice([step, -1])})
+            elif roll < 0.9:
+                records.append({"op": "del", "ids": rng.sample(ids, min(3, len(ids)))})
+            else:
+                # 重复的新增（如多个实例追加同一条）以及删除后再出现的 id
+                records.append(add(rng.choice(ids), step))
+        journal = MemoJournal(self.path)
+        journal.append(records)
+        expected = naive_replay(json.loads(json.dumps(SNAPSHOT)), records)
+        self.assertEqual(MemoJournal(self.path).load(), expected)
+
+    def test_single_record_apply(self):
+        data = json.loads(json.dumps(SNAPSHOT))
+        MemoJournal.apply(data, add(9))
+        MemoJournal.apply(data, {"op": "del", "ids": [1, 2]})
+        MemoJournal.apply(data, {"op": "set", "id": 9, "done": True, "ts": 2.0})
+        self.assertEqual([t["id"] for t in data], [9, 3, 4, 5])
+        self.assertTrue(data[0]["done"])
+
+    def test_torn_tail_truncated(self):
+        journal = MemoJournal(self.path)
+        journal.append([add(10), {"op": "del", "ids": [1]}])
+        good = os.path.getsize(journal.log_path)
+        with open(journal.log_path, "ab") as f:
+            f.write(MemoJournal._encode(add(11))[:-7])  # 崩溃时只写了一部分
+
+        data = MemoJournal(self.path).load()
+        self.assertEqual([t["id"] for t in data], [10, 2, 3, 4, 5])
+        self.assertEqual(os.path.getsize(journal.log_path), good)
+
+        # 截断后继续追加，新记录不会接在残缺的行后面
+        journal = MemoJournal(self.path)
+        journal.load()
+        journal.append([add(12)])
+        self.assertEqual([t["id"] for t in MemoJournal(self.path).load()], [12, 10, 2, 3, 4, 5])
+
+    def test_bad_checksum_stops_replay(self):
+        journal = MemoJournal(self.path)
+        journal.append([add(10)])
+        good = os.path.getsize(journal.log_path)
+        line = bytearray(MemoJournal._encode(add(11)))
+        line[-3] ^= 1
+        with open(journal.log_path, "ab") as f:
+            f.write(bytes(line) + MemoJournal._encode(add(12)))
+        self.assertEqual([t["id"] for t in MemoJournal(self.path).load()], [10, 1, 2, 3, 4, 5])
+        self.assertEqual(os.path.getsize(journal.log_path), good)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+"""后台写盘线程：合并写入与依赖写入的确认顺序"""
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
+
+from memo_persist import PersistWorker  # noqa: E402
+
+
+class PersistWorkerTest(unittest.TestCase):
+    def setUp(self):
+        self.worker = PersistWorker()
+        self.log = []
+        self.gate = threading.Event()
+        # 第一个任务阻塞写盘线程，后面提交的任务都停在队列里
+        self.worker.submit(self.gate.wait)
+
+    def tearDown(self):
+        self.gate.set()
+        self.worker.close(5)
+
+    def test_follower_runs_after_coalesced_write(self):
+        self.worker.submit(lambda: self.log.append("memo-1"), key="memo")
+        self.worker.submit_after("memo", lambda: self.log.append("ack"))
+        self.worker.submit(lambda: self.log.append("other"))
+        self.worker.submit(lambda: self.log.append("memo-2"), key="memo")
+        self.gate.set()
+        self.assertTrue(self.worker.flush(5))
+        self.assertEqual(self.log, ["other", "memo-2", "ack"])
+
+    def test_follower_skipped_when_write_fails(self):
+        def fail():
+            raise OSError("disk full")
+
+        self.worker.submit(fail, key="memo")
+        self.worker.submit_after("memo", lambda: self.log.append("ack"))
+        self.gate.set()
+        self.assertTrue(self.worker.flush(5))
+        self.assertEqual(self.log, [])
+        self.assertIsInstance(self.worker.errors.get_nowait(), OSError)
+
+    def test_follower_without_pending_write_runs_in_order(self):
+        self.worker.submit(lambda: self.log.append("a"))
+        self.worker.submit_after("memo", lambda: self.log.append("ack"))
+        self.gate.set()
+        self.assertTrue(self.worker.flush(5))
+        self.assertEqual(self.log, ["a", "ack"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""备忘录搜索：n-gram 倒排索引与增量更新"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
+
+from memo_search import NgramIndex, SearchIndexer  # noqa: E402
+
+ENTRIES = [(1, "买牛奶", False), (2, "写周报 Report", True), (3, "牛肉面", False), (4, "周末买菜", True)]
+
+
+class NgramIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = NgramIndex()
+        self.index.build(ENTRIES)
+
+    def test_search_keeps_display_order(self):
+        self.assertEqual(self.index.search("牛"), [1, 3])
+        self.assertEqual(self.index.search("买"), [1, 4])
+        self.assertEqual(self.index.search(""), [1, 2, 3, 4])
+
+    def test_multi_char_query_must_be_contiguous(self):
+        self.assertEqual(self.index.search("牛奶"), [1])
+        self.assertEqual(self.index.search("周报 r"), [2])
+        self.assertEqual(self.index.search("REPORT"), [2])
+        # “买”“菜”都在第 4 条里，但不相邻
+        self.assertEqual(self.index.search("买菜"), [4])
+        self.assertEqual(self.index.search("周末菜"), [])
+
+    def test_status_filter(self):
+        self.assertEqual(self.index.search("", "done"), [2, 4])
+        self.assertEqual(self.index.search("", "todo"), [1, 3])
+        self.assertEqual(self.index.search("买", "todo"), [1])
+
+    def test_incremental_updates(self):
+        self.index.add(5, "牛排", False)
+        self.assertEqual(self.index.search("牛"), [5, 1, 3])
+        self.index.remove(1)
+        self.index.remove(99)  # 不存在的键值忽略
+        self.assertEqual(self.index.search("牛"), [5, 3])
+        self.assertNotIn("奶", self.index.postings)
+        self.index.set_done(3, True)
+        self.assertEqual(self.index.search("牛", "done"), [3])
+        self.index.set_done(3, False)
+        self.assertEqual(self.index.search("牛", "done"), [])
+
+
+class SearchIndexerTest(unittest.TestCase):
+    def test_changes_during_build_are_replayed(self):
+        indexer = SearchIndexer()
+        indexer.start(list(ENTRIES))
+        indexer.add(5, "牛排")
+        indexer.remove(3)
+        indexer.set_done(1, True)
+        indexer._thread.join()
+        self.assertTrue(indexer.poll())
+        self.assertEqual(indexer.search("牛"), [5, 1])
+        self.assertEqual(indexer.search("", "done"), [1, 2, 4])
+
+    def test_updates_ignored_without_index(self):
+        indexer = SearchIndexer()
+        indexer.add(1, "x")
+        self.assertFalse(indexer.poll())
+        self.assertFalse(indexer.building)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""存储层批量修改完成状态、批量删除和插入时的计数"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
+
+from memo_model import MemoStore  # noqa: E402
+from memo_sqlite import SqliteMemoStore  # noqa: E402
+
+
+class ToggleManyTest(unittest.TestCase):
+    def check(self, memo):
+        events = []
+        memo.subscribe(lambda kind, **info: events.append((kind, info)))
+        keys = [memo.key(0), memo.key(2), memo.key(3)]
+        changed = memo.toggle_many(dict.fromkeys(keys, 5.0), True, dict.fromkeys(keys, 5.0))
+        self.assertEqual(sorted(changed), sorted([memo.key(0), memo.key(2)]))  # 第 4 条原本就已完成
+        self.assertEqual(memo.done_count(), 3)
+        self.assertEqual([memo.get(i)["done"] for i in range(memo.count())], [True, False, True, True])
+        self.assertEqual(len(events), 1)
+        kind, info = events[0]
+        self.assertEqual(kind, "update")
+        self.assertEqual(sorted(info["keys"]), sorted(changed))
+        self.assertTrue(info["done"])
+        self.assertEqual(memo.toggle_many(keys, True), [])
+        self.assertEqual(len(events), 1)
+
+    def tasks(self):
+        return [{"text": "a", "done": False}, {"text": "b", "done": False},
+                {"text": "c", "done": False}, {"text": "d", "done": True}]
+
+    def test_memo_store(self):
+        memo = MemoStore(self.tasks())
+        self.check(memo)
+        self.assertEqual(memo.get(0).done_ts, 5.0)
+
+    def test_sqlite_store(self):
+        memo = SqliteMemoStore(":memory:")
+        memo.replace(self.tasks())
+        self.check(memo)
+        memo.close()
+
+
+class CountersTest(unittest.TestCase):
+    def check(self, memo):
+        memo.replace([{"text": f"t{i}", "done": i % 3 == 0} for i in range(10)])
+        keys = [memo.key(i) for i in (0, 1, 3, 4)]
+        memo.delete_many(keys + [keys[0], -1])  # 重复的和不存在的 id 不影响计数
+        self.assertEqual((memo.count(), memo.done_count()), (6, 2))
+        memo.delete_many([])
+        memo.prepend([{"text": "x", "done": True}, {"text": "y", "done": False}])
+        self.assertEqual((memo.count(), memo.done_count()), (8, 3))
+        self.assertEqual([memo.get(i)["text"] for i in range(2)], ["x", "y"])
+        rows = list(memo.iter_tasks())
+        self.assertEqual((len(rows), sum(1 for t in rows if t["done"])), (8, 3))
+
+    def test_memo_store(self):
+        self.check(MemoStore())
+
+    def test_sqlite_store(self):
+        memo = SqliteMemoStore(":memory:")
+        self.check(memo)
+        memo.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
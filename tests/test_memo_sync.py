@@ -0,0 +1,113 @@
+"""多实例共享 memo_data.json：各自的修改合并后收敛，文件损坏时备份并继续"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
+
+from memo_journal import MemoJournal  # noqa: E402
+from memo_sync import MemoSync  # noqa: E402
+
+TASK = {"id": 1, "text": "x", "done": False, "text_ts": 1, "done_ts": 1}
+
+
+def task(key, text, done=False, ts=1):
+    return {"id": key, "text": text, "done": done, "text_ts": ts, "done_ts": ts}
+
+
+class TwoInstanceTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "memo_data.json")
+        first = MemoSync(MemoJournal(self.path))
+        first.load()
+        first.sync([TASK])
+        self.a = MemoSync(MemoJournal(self.path))
+        self.b = MemoSync(MemoJournal(self.path))
+        self.local_a = self.a.load()
+        self.local_b = self.b.load()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def apply(self, sync, local):
+        """模拟界面线程：只把其他实例新增的任务插到最前，与 apply_merged 一致"""
+        while not sync.results.empty():
+            _, merged = sync.results.get_nowait()
+            ids = {t["id"] for t in local}
+            local = [t for t in merged if t["id"] not in ids] + local
+        return local
+
+    def test_concurrent_adds_converge_without_rewrites(self):
+        self.local_a = [task(2, "a")] + self.local_a
+        self.local_b = [task(3, "b")] + self.local_b
+        self.a.sync(self.local_a)
+        self.b.sync(self.local_b)
+        self.a.sync(self.local_a)
+        self.local_a = self.apply(self.a, self.local_a)
+        self.local_b = self.apply(self.b, self.local_b)
+        self.assertNotEqual([t["id"] for t in self.local_a], [t["id"] for t in self.local_b])
+
+        before = os.stat(self.path)
+        for _ in range(2):
+            self.a.sync(self.local_a)
+            self.b.sync(self.local_b)
+        after = os.stat(self.path)
+        self.assertEqual((after.st_ino, after.st_mtime_ns), (before.st_ino, before.st_mtime_ns))
+        self.assertTrue(self.a.results.empty())
+        self.assertTrue(self.b.results.empty())
+        self.assertFalse(self.a.changed())
+        self.assertFalse(self.b.changed())
+        on_disk = {t["id"]: t for t in MemoJournal(self.path).load()}
+        self.assertEqual(on_disk, {t["id"]: t for t in self.local_a})
+        self.assertEqual(on_disk, {t["id"]: t for t in self.local_b})
+
+    def test_concurrent_toggle_and_delete(self):
+        self.local_a = [task(2, "a")] + self.local_a
+        self.a.sync(self.local_a)
+        self.local_b = self.b.load()
+        self.local_a = [task(2, "a", done=True, ts=5)] + self.local_a[1:]
+        self.local_b = [t for t in self.local_b if t["id"] != 1]
+        self.a.sync(self.local_a)
+        self.b.sync(self.local_b)
+        self.assertEqual(MemoJournal(self.path).load(), [task(2, "a", done=True, ts=5)])
+        self.a.sync(self.local_a)
+        _, merged = self.a.results.get_nowait()
+        self.assertEqual(merged, [task(2, "a", done=True, ts=5)])
+
+
+class CorruptFileTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "memo_data.json")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_corrupt_file_moved_aside_on_load(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write('[{"text": "a", "do')
+        sync = MemoSync(MemoJournal(self.path))
+        self.assertEqual(sync.load(), [])
+        self.assertFalse(sync.changed())
+        self.assertEqual(sync.corrupt.get_nowait(), self.path + ".corrupt")
+        with open(self.path + ".corrupt", encoding="utf-8") as f:
+            self.assertEqual(f.read(), '[{"text": "a", "do')
+
+    def test_corrupt_file_during_sync_keeps_local_tasks(self):
+        sync = MemoSync(MemoJournal(self.path))
+        sync.load()
+        sync.sync([TASK])
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("{oops")
+        self.assertTrue(sync.changed())
+        sync.sync([TASK])
+        self.assertFalse(sync.changed())
+        self.assertTrue(sync.results.empty())
+        self.assertEqual(MemoJournal(self.path).load(), [TASK])
+        self.assertFalse(sync.corrupt.empty())
+
+
+if __name__ == "__main__":
+    unittest.main()
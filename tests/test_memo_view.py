@@ -0,0 +1,68 @@
+"""任务列表的增量更新：删除时按键值取消选中，插入时视图不动，see 滚动到指定行"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
+
+from memo_view import VirtualTaskList  # noqa: E402
+
+
+class FakeTaskList:
+    """只带偏移和选择状态的 VirtualTaskList，不创建控件"""
+
+    rows_removed = VirtualTaskList.rows_removed
+    rows_inserted = VirtualTaskList.rows_inserted
+    see = VirtualTaskList.see
+    scroll_to = VirtualTaskList.scroll_to
+    _max_offset = VirtualTaskList._max_offset
+    _total_height = VirtualTaskList._total_height
+
+    def __init__(self, offset=0, rows=100, height=460):
+        self.offset = offset
+        self.row_height = 46
+        self.selected = set()
+        self.refreshed = 0
+        self.rows = rows
+        self.count = lambda: self.rows
+        self.viewport = type("Viewport", (), {"winfo_height": lambda _: height})()
+
+    def refresh(self):
+        self.refreshed += 1
+
+
+class RowsRemovedTest(unittest.TestCase):
+    def test_removed_keys_leave_selection(self):
+        view = FakeTaskList()
+        view.selected = {"a", "b", "c"}
+        view.rows_removed({0, 5}, ["a", "c"])
+        self.assertEqual(view.selected, {"b"})
+        self.assertEqual(view.refreshed, 1)
+
+    def test_rows_above_viewport_keep_visible_content(self):
+        view = FakeTaskList(offset=10 * 46)
+        view.rows_removed({1, 2, 30}, ["x", "y", "z"])
+        self.assertEqual(view.offset, 8 * 46)
+
+
+class SeeTest(unittest.TestCase):
+    def test_new_top_row_scrolled_into_view(self):
+        view = FakeTaskList(offset=20 * 46)
+        view.rows += 1
+        view.rows_inserted(0)
+        self.assertEqual(view.offset, 21 * 46)  # 插入在视口上方，可见内容不动
+        view.see(0)
+        self.assertEqual(view.offset, 0)
+
+    def test_see_scrolls_only_when_needed(self):
+        view = FakeTaskList(offset=10 * 46)
+        view.see(12)
+        self.assertEqual((view.offset, view.refreshed), (10 * 46, 0))
+        view.see(25)
+        self.assertEqual(view.offset, 26 * 46 - 460)
+        view.see(99)
+        self.assertEqual(view.offset, view._max_offset())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""记事本自动保存：保存后按版本还原，多个实例交替保存时历史不会错乱"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
+
+from note_autosave import NoteHistory  # noqa: E402
+
+TEXTS = ["", "第一行", "第一行\n第二行", "开头\n第一行\n第二行", "开头\n第二行 😀", "完全不同的内容"]
+
+
+class NoteHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "note_history")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def assert_history(self, history, texts):
+        """texts 按保存先后排列，最新的在最后"""
+        self.assertEqual(len(history.versions()), len(texts))
+        for k, text in enumerate(reversed(texts)):
+            self.assertEqual(history.restore(k), text)
+
+    def test_save_and_restore(self):
+        history = NoteHistory(self.path)
+        self.assertEqual(history.load(), "")
+        for text in TEXTS[1:]:
+            history.save(text)
+        history.save(TEXTS[-1])  # 内容没变不增加版本
+        self.assert_history(history, TEXTS[1:])
+
+        reopened = NoteHistory(self.path)
+        self.assertEqual(reopened.load(), TEXTS[-1])
+        self.assert_history(reopened, TEXTS[1:])
+
+    def test_crash_before_latest_replaced(self):
+        history = NoteHistory(self.path)
+        history.load()
+        history.save("a")
+        history.save("ab")
+        with open(history.latest_path, "rb") as f:
+            latest = f.read()
+        size = os.path.getsize(history.log_path)
+        history.save("abc")
+        # 模拟追加增量后、替换最新版本前崩溃：日志多一条，最新版本还是旧的
+        with open(history.latest_path, "wb") as f:
+            f.write(latest)
+
+        reopened = NoteHistory(self.path)
+        self.assertEqual(reopened.load(), "ab")
+        self.assert_history(reopened, ["a", "ab"])
+        self.assertEqual(os.path.getsize(history.log_path), size)
+
+    def test_two_instances_interleave(self):
+        first = NoteHistory(self.path)
+        second = NoteHistory(self.path)
+        first.load()
+        second.load()
+        first.save("共同的开头")
+        second.save("实例二的内容")
+        first.save("实例一的内容")
+        second.save("实例二再次修改")
+        expected = ["共同的开头", "实例二的内容", "实例一的内容", "实例二再次修改"]
+        self.assert_history(first, expected)
+        self.assert_history(second, expected)
+        reopened = NoteHistory(self.path)
+        reopened.load()
+        self.assert_history(reopened, expected)
+
+    def test_trim_keeps_recent_versions(self):
+        history = NoteHistory(self.path, max_versions=3)
+        history.load()
+        for i in range(8):
+            history.save(f"版本 {i}")
+        self.assert_history(history, [f"版本 {i}" for i in range(4, 8)])
+        other = NoteHistory(self.path, max_versions=3)
+        other.load()
+        self.assert_history(other, [f"版本 {i}" for i in range(4, 8)])
+
+    def test_corrupt_latest_starts_over(self):
+        history = NoteHistory(self.path)
+        history.load()
+        history.save("a")
+        history.save("ab")
+        with open(history.latest_path, "wb") as f:
+            f.write(b"broken")
+        history.save("new")
+        self.assert_history(history, ["new"])
+
+
+if __name__ == "__main__":
+    unittest.main()
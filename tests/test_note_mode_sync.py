@@ -0,0 +1,123 @@
+"""便签模式下（任务列表还没创建）应用其他实例和同步服务器的修改"""
+import importlib.util
+import os
+import queue
+import sys
+import unittest
+
+PY_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py")
+sys.path.insert(0, PY_DIR)
+
+from memo_model import MemoStore  # noqa: E402
+from memo_search import SearchIndexer  # noqa: E402
+
+_spec = importlib.util.spec_from_file_location("notepad_app", os.path.join(PY_DIR, "记事本便签.py"))
+app = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(app)
+
+
+class FakeScheduler:
+    def invalidate(self, name, fn, priority=0):
+        pass
+
+    def flush(self):
+        pass
+
+
+class FakeRoot:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, fn):
+        self.scheduled.append(fn)
+
+
+class FakePersist:
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, key=None):
+        self.jobs.append(fn)
+
+    def submit_after(self, key, fn):
+        self.jobs.append(fn)
+
+
+class FakeDelta:
+    def __init__(self):
+        self.known = set()
+        self.results = queue.Queue()
+        self.acked = []
+        self.rewound = False
+
+    def deleted_locally(self, key):
+        return False
+
+    def track(self, records):
+        pass
+
+    def ack(self, cursor):
+        self.acked.append(cursor)
+
+    def rewind(self):
+        self.rewound = True
+
+
+class NoteModeApp:
+    """只带存储层和同步相关状态的 TopNotepad，不创建任何控件"""
+
+    on_memo_change = app.TopNotepad.on_memo_change
+    track_delta = app.TopNotepad.track_delta
+    poll_delta_sync = app.TopNotepad.poll_delta_sync
+    apply_server_changes = app.TopNotepad.apply_server_changes
+    update_stats = app.TopNotepad.update_stats
+    _render_stats = app.TopNotepad._render_stats
+    _flush_records = app.TopNotepad._flush_records
+
+    def __init__(self, tasks):
+        self.root = FakeRoot()
+        self.scheduler = FakeScheduler()
+        self.persist = FakePersist()
+        self.delta = FakeDelta()
+        self.search = SearchIndexer()
+        self.store = "journal"  # 不走整体保存，测试只关心应用和确认
+        self.task_frame = None
+        self.stats_label = None
+        self.filter_keys = None
+        self._applying_server = False
+        self._applying_remote = False
+        self._pending_records = []
+        self.memo = MemoStore(tasks)
+        self.memo.subscribe(self.on_memo_change)
+
+
+class NoteModeSyncTest(unittest.TestCase):
+    def setUp(self):
+        self.app = NoteModeApp([{"text": "a", "done": False}, {"text": "b", "done": False}])
+
+    def test_server_delete_without_task_list(self):
+        key = self.app.memo.key(0)
+        self.app.delta.results.put((7, [{"id": key, "deleted_ts": 5.0}]))
+        self.app.poll_delta_sync()
+        self.assertFalse(self.app.memo.has(key))
+        self.assertEqual(self.app.memo.count(), 1)
+        for job in self.app.persist.jobs:
+            job()
+        self.assertEqual(self.app.delta.acked, [7])
+        self.assertEqual(len(self.app.root.scheduled), 1)
+
+    def test_failed_apply_rewinds_and_keeps_polling(self):
+        def fail(changes):
+            raise RuntimeError("boom")
+
+        self.app.apply_server_changes = fail
+        self.app.delta.results.put((3, [{"id": 1, "deleted_ts": 1.0}]))
+        with self.assertRaises(RuntimeError):
+            self.app.poll_delta_sync()
+        self.assertTrue(self.app.delta.rewound)
+        self.assertEqual(self.app.persist.jobs, [])
+        self.assertEqual(len(self.app.root.scheduled), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""增量同步：merge_record 的合并规则，参考服务器按 cursor 和来源过滤变更"""
+import itertools
+import os
+import random
+import sys
+import threading
+import unittest
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
+
+from sync_protocol import PROTOCOL, decode_body, encode_body, merge_record  # noqa: E402
+from sync_server import SyncStore, make_server  # noqa: E402
+
+
+def record(key, text="t", text_ts=1.0, done=False, done_ts=1.0, deleted_ts=0):
+    return {"id": key, "text": text, "text_ts": text_ts, "done": done, "done_ts": done_ts,
+            "deleted_ts": deleted_ts}
+
+
+class MergeRecordTest(unittest.TestCase):
+    def test_newer_field_wins_independently(self):
+        a = record(1, text="旧", text_ts=1.0, done=True, done_ts=5.0)
+        b = record(1, text="新", text_ts=2.0, done=False, done_ts=3.0)
+        merged = merge_record(a, b)
+        self.assertEqual((merged["text"], merged["text_ts"]), ("新", 2.0))
+        self.assertEqual((merged["done"], merged["done_ts"]), (True, 5.0))
+
+    def test_tie_picks_larger_value(self):
+        a = record(1, text="a", text_ts=1.0, done=False, done_ts=1.0)
+        b = record(1, text="b", text_ts=1.0, done=True, done_ts=1.0)
+        self.assertEqual(merge_record(a, b), merge_record(b, a))
+        self.assertEqual(merge_record(a, b)["text"], "b")
+        self.assertTrue(merge_record(a, b)["done"])
+
+    def test_delete_wins_over_later_edit(self):
+        deleted = merge_record(record(1), {"id": 1, "deleted_ts": 2.0})
+        self.assertEqual(deleted["deleted_ts"], 2.0)
+        edited = merge_record(deleted, record(1, text="晚到的修改", text_ts=9.0))
+        self.assertEqual(edited["deleted_ts"], 2.0)
+
+    def test_first_version(self):
+        self.assertEqual(merge_record(None, record(1)), record(1))
+
+    def test_commutative_associative_idempotent(self):
+        rng = random.Random(7)
+        versions = [record(1, text=rng.choice("abc"), text_ts=rng.randint(0, 3), done=rng.random() < 0.5,
+                           done_ts=rng.randint(0, 3), deleted_ts=rng.choice([0, 0, 4]))
+                    for _ in range(6)]
+        for a, b in itertools.product(versions, repeat=2):
+            self.assertEqual(merge_record(a, b), merge_record(b, a))
+            self.assertEqual(merge_record(merge_record(a, b), b), merge_record(a, b))
+        for a, b, c in itertools.permutations(versions[:4], 3):
+            self.assertEqual(merge_record(merge_record(a, b), c), merge_record(a, merge_record(b, c)))
+
+
+class SyncStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = SyncStore(":memory:")
+
+    def test_own_changes_not_returned(self):
+        reply = self.store.sync("A", 0, [record(1), record(2)], 100)
+        self.assertEqual(reply, {"cursor": 2, "changes": [], "more": False})
+        reply = self.store.sync("B", 0, [], 100)
+        self.assertEqual([c["id"] for c in reply["changes"]], [1, 2])
+        self.assertEqual(reply["cursor"], 2)
+
+    def test_cursor_returns_only_newer_versions(self):
+        self.store.sync("A", 0, [record(1), record(2)], 100)
+        cursor = self.store.sync("B", 0, [], 100)["cursor"]
+        self.store.sync("A", 2, [record(2, text="改", text_ts=2.0)], 100)
+        reply = self.store.sync("B", cursor, [], 100)
+        self.assertEqual(reply["changes"], [record(2, text="改", text_ts=2.0)])
+        self.assertEqual(self.store.sync("B", reply["cursor"], [], 100)["changes"], [])
+
+    def test_stale_upload_does_not_bump_version(self):
+        self.store.sync("A", 0, [record(1, text="新", text_ts=5.0)], 100)
+        reply = self.store.sync("B", 0, [record(1, text="旧", text_ts=1.0)], 100)
+        self.assertEqual(reply["cursor"], 1)
+        self.assertEqual(reply["changes"], [record(1, text="新", text_ts=5.0)])
+
+    def test_conflict_result_sent_back_to_uploader(self):
+        self.store.sync("A", 0, [record(1, text="a", text_ts=1.0, done=True, done_ts=5.0)], 100)
+        reply = self.store.sync("B", 1, [record(1, text="b", text_ts=2.0, done=False, done_ts=2.0)], 100)
+        # 合并结果与 B 上传的不同（完成状态来自 A），B 也要取回
+        self.assertEqual(reply["changes"], [record(1, text="b", text_ts=2.0, done=True, done_ts=5.0)])
+
+    def test_deletes_kept_as_tombstones(self):
+        self.store.sync("A", 0, [record(1)], 100)
+        self.store.sync("A", 1, [{"id": 1, "deleted_ts": 3.0}], 100)
+        self.store.sync("B", 0, [record(1, text="晚到", text_ts=9.0)], 100)
+        reply = self.store.sync("C", 0, [], 100)
+        self.assertEqual(len(reply["changes"]), 1)
+        self.assertEqual(reply["changes"][0]["deleted_ts"], 3.0)
+
+    def test_paging(self):
+        self.store.sync("A", 0, [record(i) for i in range(1, 6)], 100)
+        seen = []
+        cursor = 0
+        while True:
+            reply = self.store.sync("B", cursor, [], 2)
+            seen.extend(c["id"] for c in reply["changes"])
+            cursor = reply["cursor"]
+            if not reply["more"]:
+                break
+        self.assertEqual(seen, [1, 2, 3, 4, 5])
+        self.assertEqual(cursor, 5)
+
+
+class SyncServerTest(unittest.TestCase):
+    def test_http_round_trip(self):
+        server = make_server(":memory:", port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/sync"
+
+            def post(client, cursor, changes):
+                body = encode_body({"v": PROTOCOL, "client": client, "cursor": cursor, "changes": changes})
+                request = urllib.request.Request(url, data=body, method="POST")
+                with urllib.request.urlopen(request, timeout=5) as response:
+                    return decode_body(response.read())
+
+            self.assertEqual(post("A", 0, [record(1)])["changes"], [])
+            self.assertEqual(post("B", 0, [])["changes"], [record(1)])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""按帧合并界面更新：同名请求只执行最后一次，按优先级顺序执行"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
+
+from ui_scheduler import (  # noqa: E402
+    PRIORITY_LAYOUT, PRIORITY_PERSIST, PRIORITY_STATS, PRIORITY_VISUAL, FrameScheduler,
+)
+
+
+class FakeRoot:
+    """记录 after/after_idle 登记的回调，由测试手动触发"""
+
+    def __init__(self):
+        self.pending = {}
+        self.ids = 0
+        self.errors = []
+
+    def _add(self, fn):
+        self.ids += 1
+        self.pending[self.ids] = fn
+        return self.ids
+
+    def after(self, ms, fn):
+        return self._add(fn)
+
+    def after_idle(self, fn):
+        return self._add(fn)
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def report_callback_exception(self, exc, val, tb):
+        self.errors.append(val)
+
+    def run(self):
+        pending, self.pending = self.pending, {}
+        for fn in pending.values():
+            fn()
+
+
+class FrameSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.root = FakeRoot()
+        self.scheduler = FrameScheduler(self.root)
+        self.calls = []
+
+    def test_same_name_runs_once_with_last_callback(self):
+        for i in range(5):
+            self.scheduler.invalidate("alpha", lambda i=i: self.calls.append(i), PRIORITY_VISUAL)
+        self.assertEqual(len(self.root.pending), 1)
+        self.root.run()
+        self.assertEqual(self.calls, [4])
+        self.root.run()
+        self.assertEqual(self.calls, [4])
+
+    def test_priority_then_registration_order(self):
+        self.scheduler.invalidate("journal", lambda: self.calls.append("journal"), PRIORITY_PERSIST)
+        self.scheduler.invalidate("stats", lambda: self.calls.append("stats"), PRIORITY_STATS)
+        self.scheduler.invalidate("filter", lambda: self.calls.append("filter"), PRIORITY_LAYOUT)
+        self.scheduler.invalidate("layout", lambda: self.calls.append("layout"), PRIORITY_LAYOUT)
+        self.scheduler.invalidate("alpha", lambda: self.calls.append("alpha"), PRIORITY_VISUAL)
+        # 替换回调不改变原来的登记顺序
+        self.scheduler.invalidate("filter", lambda: self.calls.append("filter2"), PRIORITY_LAYOUT)
+        self.root.run()
+        self.assertEqual(self.calls, ["alpha", "filter2", "layout", "stats", "journal"])
+
+    def test_failing_job_does_not_stop_others(self):
+        self.scheduler.invalidate("bad", lambda: 1 / 0, PRIORITY_VISUAL)
+        self.scheduler.invalidate("stats", lambda: self.calls.append("stats"), PRIORITY_STATS)
+        self.root.run()
+        self.assertEqual(self.calls, ["stats"])
+        self.assertEqual(len(self.root.errors), 1)
+
+    def test_work_added_during_flush_waits_for_next_frame(self):
+        def first():
+            self.calls.append("first")
+            self.scheduler.invalidate("second", lambda: self.calls.append("second"))
+
+        self.scheduler.invalidate("first", first)
+        self.root.run()
+        self.assertEqual(self.calls, ["first"])
+        self.root.run()
+        self.assertEqual(self.calls, ["first", "second"])
+
+    def test_flush_runs_now_and_cancels_scheduled_frame(self):
+        self.scheduler.invalidate("stats", lambda: self.calls.append("stats"), PRIORITY_STATS)
+        self.scheduler.flush()
+        self.assertEqual(self.calls, ["stats"])
+        self.assertEqual(self.root.pending, {})
+
+
+if __name__ == "__main__":
+    unittest.main()